@@ -26,8 +26,12 @@ rm get-pip.py
 # make sure pip is newest version
 pip3 install -U pip
 
-#install django and the LDAP backend
-pip3 install django django_auth_ldap
+#install django and the LDAP backend (brotli: precompressed static files)
+pip3 install django django_auth_ldap brotli
+
+# serve the precompressed static files (conf/lernecken-ssl.conf)
+a2enmod rewrite
+a2enmod headers
 
 # copy configuration files to target locations
 cp conf/lernecken.conf /etc/apache2/vhosts.d/
@@ -41,6 +45,9 @@ sed 's/SECRET_KEY\s=\s"DEFAULT"/SECRET_KEY = "'$(python3 schnuffelecken/manage.p
 # create daily cron job to remove old booking
 cp remove_old_bookings.sh /etc/cron.daily
 
+# create hourly cron job to keep the statistics current
+cp rollup_statistics.sh /etc/cron.hourly
+
 # install dfn root certificate for LDAP authentication
 wget http://cdp.pca.dfn.de/global-root-ca/pub/cacert/cacert.pem -O /etc/ssl/certs/cacert.pem
 
@@ -1,2 +1,3 @@
 #!/bin/sh
 python3 /srv/www/lernecken/schnuffelecken/manage.py remove_old_bookings
+python3 /srv/www/lernecken/schnuffelecken/manage.py clearsessions
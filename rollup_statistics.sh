@@ -0,0 +1,2 @@
+#!/bin/sh
+python3 /srv/www/lernecken/schnuffelecken/manage.py rollup_statistics
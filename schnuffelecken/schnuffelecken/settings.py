@@ -20,6 +20,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # first, so the queries of the other middleware are counted as well
+    'website.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,17 +58,58 @@ DATABASES = {
     }
 }
 
+# Process-local cache. mod_wsgi runs a single daemon process per default,
+# use a shared backend (e.g. memcached) when running several processes.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Pragmas applied to every SQLite connection (see website/db.py). WAL lets
+# readers continue while a booking is written, busy_timeout (ms) makes
+# writers wait for the lock instead of failing with "database is locked".
+# Set to {} to use the SQLite defaults. Compare with: manage.py benchmark_sqlite
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,
+    'mmap_size': 67108864,
+}
+
 AUTHENTICATION_BACKENDS = [
-    # authenticate employees and students (frontend)
-    'django_auth_ldap.backend.LDAPBackend',
+    # authenticate employees and students (frontend), django_auth_ldap
+    # with one persistent connection per thread
+    'website.ldap_backend.PooledLDAPBackend',
     # authenticate superuser (backend)
     'django.contrib.auth.backends.ModelBackend',
 ]
 
+# password of website.backends.LoadTestBackend, which accepts any username
+# with it (manage.py loadtest). To run a load test against a local instance,
+# add the backend to AUTHENTICATION_BACKENDS and set a password in
+# settings_secret.py. NEVER set this in production.
+LOAD_TEST_PASSWORD = None
+
 
 # log out user automatically after n seconds by deleting session cookie
 SESSION_COOKIE_AGE = 3600
 
+# where sessions are stored (compare the database writes: manage.py benchmark_sessions)
+# - db: in the database (Django's default). A session writes on login and logout
+#   only: 3 session writes of 4 in total for login, 5 page views and logout.
+# - cached_db: as db, but reads from CACHES, which then must be shared by all
+#   processes (e.g. memcached), or a logout is not seen by the other processes
+# - cache: only in the shared CACHES, 0 session writes (1 write in total)
+# - signed_cookies: in the signed cookie itself, 0 session writes (1 write in
+#   total). A logout deletes the cookie, but a copy of it stays valid until
+#   SESSION_COOKIE_AGE: do NOT use it while students log in on shared machines.
+# Only the database sessions can be ended on the server, so they are the default;
+# the others can be chosen in settings_secret.py.
+# Expired database sessions are removed daily by clearsessions (remove_old_bookings.sh).
+SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
 # LDAP-specific settings
 AUTH_LDAP_CONNECTION_OPTIONS = {
     ldap.OPT_DEBUG_LEVEL: 0,
@@ -75,6 +118,11 @@ AUTH_LDAP_CONNECTION_OPTIONS = {
 
 AUTH_LDAP_START_TLS = True
 
+# cache the LDAP attributes of a user and group memberships for this long,
+# in seconds (0 disables the attribute cache)
+LDAP_ATTRIBUTE_CACHE_TIMEOUT_IN_SECONDS = 300
+AUTH_LDAP_CACHE_TIMEOUT = 300
+
 # Localization settings
 LANGUAGE_CODE = 'DE'
 TIME_ZONE = 'CET'
@@ -91,6 +139,11 @@ STATICFILES_DIRs = [
 
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
+# collectstatic writes the files under content-hashed names plus gzip (and,
+# with the brotli module installed, brotli) variants, which Apache serves with
+# far-future cache headers (conf/lernecken-ssl.conf). Report: manage.py benchmark_static
+STATICFILES_STORAGE = 'website.storage.CompressedManifestStaticFilesStorage'
+
 # Bookings quota per user (total for the next 4 weeks and both lernecken)
 BOOKINGS_QUOTA = 10
 
@@ -100,12 +153,30 @@ STAFF_ACCESS = False
 # in production, ALWAYS set this to False
 DEBUG = False
 
+# send the number of SQL queries and their time as Server-Timing header
+# with every response (they are always logged by website.middleware),
+# set it to True in settings_secret.py on a development machine
+QUERY_COUNT_HEADER = False
+
 # every 24 hours, bookings older than this value will be removed
 OLD_BOOKINGS_EXPIRATION_IN_DAYS = 30
 
+# old bookings are removed in batches of this size, each in its own transaction
+OLD_BOOKINGS_BATCH_SIZE = 500
+
+# how long the occupancy of a facility may be cached, in seconds
+# (changes made through the application invalidate it immediately)
+OCCUPANCY_CACHE_TIMEOUT_IN_SECONDS = 3600
+
 # how often the status page should be refreshed when displayed, in seconds
 STATUS_PAGE_REFRESH_RATE_IN_SECONDS = 30
 
+# server-sent events: how long one stream is kept open, how often it checks
+# for changes (both in seconds) and how fast browsers reconnect (in milliseconds)
+EVENT_STREAM_DURATION_IN_SECONDS = 60
+EVENT_STREAM_POLL_INTERVAL_IN_SECONDS = 2
+EVENT_STREAM_RETRY_IN_MILLISECONDS = 1000
+
 # full URL of where the system is deployed (displayed in footer of status page)
 URL = "https://lernecken.hs-mannheim.de"
 
@@ -1,10 +1,109 @@
+from datetime import datetime, timedelta
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
 
-from website.models import Booking, Statistic
+from website.models import FACILITIES, Booking, HourlyStatistic, Statistic
 
 """
 Register model classes to be modifiable from the admin backend.
 Only makes sense for persisted models, of course.
+
+The change lists are made for large tables: search only compares the
+user exactly (backed by the (user, date) index), facilities are filtered
+without scanning the table and rows are counted only up to a limit.
 """
-admin.site.register(Booking)
-admin.site.register(Statistic)
+
+
+class CappedCountPaginator(Paginator):
+    """
+    Paginator that counts at most limit rows (SELECT COUNT(*) of a
+    subquery with LIMIT), so large tables are not scanned for the number
+    of pages. Narrow the list with the filters to get beyond the limit.
+    """
+    limit = 10000
+
+    @cached_property
+    def count(self):
+        return self.object_list.order_by()[:self.limit].count()
+
+
+class FacilityFilter(admin.SimpleListFilter):
+    """Filter by the known facilities instead of a SELECT DISTINCT"""
+    title = 'facility'
+    parameter_name = 'facility'
+
+    def lookups(self, request, model_admin):
+        return [(facility, facility.upper()) for facility in FACILITIES]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(facility=self.value())
+        return queryset
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    paginator = CappedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Booking)
+class BookingAdmin(ScalableAdmin):
+    list_display = ('date', 'facility', 'user')
+    list_filter = (FacilityFilter, 'date')
+    date_hierarchy = 'date'
+    ordering = ('-date',)
+    search_fields = ('user',)
+    actions = ['cancel_bookings', 'cancel_days']
+
+    def get_search_results(self, request, queryset, search_term):
+        """Bookings of exactly this user: LIKE '%term%' could not use an index"""
+        search_term = search_term.strip()
+        if search_term:
+            queryset = queryset.filter(user=search_term)
+        return queryset, False
+
+    def cancel_bookings(self, request, queryset):
+        """
+        Cancel the selected bookings that have not started yet, without the
+        confirmation page that loads every object (started bookings are kept
+        for the statistics). BookingQuerySet.delete reads their users and
+        dates once to update the quota and the facility versions.
+        """
+        count = queryset.filter(date__gt=datetime.now()).delete()[0]
+        self.message_user(request, "{0} Buchungen storniert".format(count))
+    cancel_bookings.short_description = "Ausgewählte kommende Buchungen stornieren"
+
+    def cancel_days(self, request, queryset):
+        """
+        Cancel every booking that has not started yet on the days and
+        facilities of the selected bookings (e.g. a closed building)
+        """
+        days = Q()
+        for facility, day in set((facility, date.date()) for facility, date
+                                 in queryset.values_list('facility', 'date')):
+            start = datetime.combine(day, datetime.min.time())
+            days |= Q(facility=facility, date__gte=start, date__lt=start + timedelta(1))
+
+        count = 0
+        if days:
+            count = Booking.objects.filter(days, date__gt=datetime.now()).delete()[0]
+        self.message_user(request, "{0} Buchungen storniert".format(count))
+    cancel_days.short_description = "Alle kommenden Buchungen dieser Tage und Gebäude stornieren"
+
+
+@admin.register(Statistic)
+class StatisticAdmin(ScalableAdmin):
+    list_display = ('year', 'calendar_week', 'facility', 'bookings')
+    list_filter = (FacilityFilter, 'year')
+    ordering = ('-year', '-calendar_week', 'facility')
+
+
+@admin.register(HourlyStatistic)
+class HourlyStatisticAdmin(ScalableAdmin):
+    list_display = ('date', 'hour', 'facility', 'bookings')
+    list_filter = (FacilityFilter, 'date')
+    date_hierarchy = 'date'
+    ordering = ('-date', '-hour', 'facility')
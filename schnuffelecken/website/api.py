@@ -0,0 +1,136 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from datetime import datetime
+
+from website.models import BookingPeriod, Booking, Day
+from website.viewmodels import *
+from website.views import handle_booking, handle_batch_booking, handle_cancellation
+
+"""
+JSON API of the booking tables. It allows the bookings page to book
+and cancel blocks and update them in place instead of reloading and
+rendering all four weeks.
+"""
+
+STATES = {
+    BlockAvailable: "a",
+    BlockBooked: "b",
+    BlockReserved: "r",
+}
+
+
+def error(message, status_code):
+    return JsonResponse({"error": message}, status=status_code)
+
+
+def parse_timestamp(value):
+    try:
+        return datetime.fromtimestamp(float(value))
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+@require_http_methods(["GET", "POST"])
+def slots(request, facility):
+    """
+    GET: occupancy of the weeks "from" to "to" (1 to 4) of the current
+    BookingPeriod. Each day is a string with one character per block:
+    a = available, b = booked, r = reserved (by the requesting user).
+
+    POST: book or cancel the block given by its timestamp in "book" or
+    "cancel". Responds with the changed block, the new quota and the alert.
+    Several "book" timestamps are booked at once (all or nothing, unless
+    "partial" is 1), the response then contains all blocks and the alert
+    of every block.
+    """
+    if request.method == "POST":
+        return change_slot(request, facility)
+
+    try:
+        first = int(request.GET.get("from", 1))
+        last = int(request.GET.get("to", 4))
+    except ValueError:
+        return error("Invalid week range", 400)
+
+    booking_period = BookingPeriod(datetime.now())
+
+    if not 1 <= first <= last <= booking_period.num_weeks:
+        return error("Invalid week range", 400)
+
+    booking_period.load_bookings(facility)
+
+    weeks = [{
+        "calendar_week": week.calendar_week,
+        "days": [{
+            "date": day.date.strftime("%Y-%m-%d"),
+            "slots": "".join(STATES[type(block)]
+                             for block in day.get_bookings(facility, request.user)),
+        } for day in week.days],
+    } for week in booking_period.weeks[first - 1:last]]
+
+    return JsonResponse({
+        "version": booking_period.version,
+        "first_hour": Day.start_hour,
+        "weeks": weeks,
+    })
+
+
+def change_slot(request, facility):
+    if not request.user.is_authenticated:
+        return error("Login required", 403)
+
+    if len(request.POST.getlist("book")) > 1:
+        return book_slots(request, facility)
+
+    if "cancel" in request.POST:
+        date = parse_timestamp(request.POST["cancel"])
+        handle = handle_cancellation
+    elif "book" in request.POST:
+        date = parse_timestamp(request.POST["book"])
+        handle = handle_booking
+    else:
+        return error("Either book or cancel is required", 400)
+
+    if date is None:
+        return error("Invalid timestamp", 400)
+
+    info = handle(request, facility)
+    username = request.user.username
+
+    owner = Booking.objects.filter(
+        facility=facility, date=date).values_list('user', flat=True).first()
+
+    response = JsonResponse({
+        "slot": block_data(Day.create_block(date, owner, username)),
+        "quota": Booking.get_user_quota(username),
+        "alert": alert_data(info),
+    })
+    response.status_code = info.status_code
+
+    return response
+
+
+def book_slots(request, facility):
+    dates = [parse_timestamp(value) for value in request.POST.getlist("book")]
+
+    if None in dates:
+        return error("Invalid timestamp", 400)
+
+    info, alerts = handle_batch_booking(request, facility)
+    username = request.user.username
+
+    owners = dict(Booking.objects.filter(
+        facility=facility, date__in=dates).values_list('date', 'user'))
+
+    response = JsonResponse({
+        "slots": [block_data(Day.create_block(date, owners.get(date), username))
+                  for date, _ in alerts],
+        "results": [dict(alert_data(alert), timestamp=str(date.timestamp()))
+                    for date, alert in alerts],
+        "quota": Booking.get_user_quota(username),
+        "alert": alert_data(info),
+    })
+    response.status_code = info.status_code
+
+    return response
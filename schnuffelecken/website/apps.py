@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class WebsiteConfig(AppConfig):
     name = 'website'
+
+    def ready(self):
+        from website.db import configure_connection
+        connection_created.connect(configure_connection)
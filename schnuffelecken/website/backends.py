@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+
+"""
+Authentication backends besides LDAP.
+"""
+
+
+class LoadTestBackend(object):
+    """
+    Stand-in for LDAP during load tests: accepts every username with
+    settings.LOAD_TEST_PASSWORD and creates the user on first login.
+    Does nothing unless LOAD_TEST_PASSWORD is set, never set it in production.
+    """
+
+    def authenticate(self, request=None, username=None, password=None):
+        expected = getattr(settings, 'LOAD_TEST_PASSWORD', None)
+
+        if not expected or not username or password != expected:
+            return None
+
+        return User.objects.get_or_create(username=username)[0]
+
+    def get_user(self, user_id):
+        try:
+            return User.objects.get(pk=user_id)
+        except User.DoesNotExist:
+            return None
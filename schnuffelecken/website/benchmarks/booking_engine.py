@@ -0,0 +1,185 @@
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.test import RequestFactory
+
+from website import views
+from website.db import QueryCounter
+from website.models import *
+
+"""
+Micro-benchmarks of the booking engine. seed() fills the (test) database
+with a realistic amount of bookings, run() times the hot paths on it and
+compare() checks the results against a stored baseline.
+"""
+
+
+def slots(start, days, direction=1):
+    """Yield the bookable hours of the workdays from start on (or backwards)"""
+    date = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    found = 0
+
+    while found < days:
+        if date.weekday() < 5:
+            found += 1
+            for hour in range(Day.start_hour, Day.end_hour):
+                yield date.replace(hour=hour)
+        date += timedelta(direction)
+
+
+def seed(bookings=5000, users=500, facilities=('g', 'h'), occupancy=0.5, random_seed=0):
+    """
+    Create users and bookings. The upcoming booking period is booked
+    to the given share (occupancy), the remaining bookings lie in the
+    past, older than the expiration threshold, for remove_old. The past
+    bookings are rolled up into the statistics, as by the hourly job.
+    """
+    generator = random.Random(random_seed)
+    usernames = ["bench{0}".format(i) for i in range(0, users)]
+    User.objects.bulk_create([User(username=username) for username in usernames])
+
+    upcoming = list(slots(BookingPeriod().start + timedelta(7), 15))
+    past = slots(Booking.expiration_threshold() - timedelta(1), bookings, -1)
+
+    candidates = []
+    for facility in facilities:
+        candidates.extend((date, facility) for date in upcoming
+                          if generator.random() < occupancy)
+    candidates = candidates[:bookings]
+
+    while len(candidates) < bookings:
+        date = next(past)
+        candidates.extend((date, facility) for facility in facilities)
+    candidates = candidates[:bookings]
+
+    Booking.objects.bulk_create([
+        Booking(date=date, facility=facility, user=generator.choice(usernames))
+        for date, facility in candidates], batch_size=500)
+    QuotaUsage.rebuild()
+    Statistic.roll_up()
+    FacilityVersion.bump(*facilities)
+    cache.clear()
+
+    return usernames
+
+
+def free_slot(facility):
+    """Return the first bookable hour of the facility that is not booked"""
+    taken = set(Booking.objects.filter(
+        facility=facility, date__gte=datetime.now()).values_list('date', flat=True))
+
+    for date in slots(BookingPeriod().start + timedelta(7), 15):
+        if date not in taken:
+            return date
+
+
+def rolled_back(function):
+    """Run function in a transaction that is rolled back afterwards"""
+    def wrapper():
+        with transaction.atomic():
+            function()
+            transaction.set_rollback(True)
+        cache.clear()
+
+    return wrapper
+
+
+def cold(function):
+    """Run function with an empty cache"""
+    def wrapper():
+        cache.clear()
+        function()
+
+    return wrapper
+
+
+def measure(function, repeat):
+    """Return timings (in ms) and the number of queries of function"""
+    timings = []
+
+    for _ in range(0, repeat):
+        with QueryCounter() as counter:
+            start = timeit.default_timer()
+            function()
+            timings.append((timeit.default_timer() - start) * 1000)
+
+    timings.sort()
+    return {
+        "min_ms": timings[0],
+        "median_ms": timings[len(timings) // 2],
+        "mean_ms": sum(timings) / len(timings),
+        "queries": counter.count,
+    }
+
+
+def hot_paths(username, facility):
+    """Return the benchmarked functions by name"""
+    user = User.objects.get_or_create(username=username)[0]
+    factory = RequestFactory()
+
+    def view_models():
+        booking_period = BookingPeriod(datetime.now())
+        booking_period.load_bookings(facility)
+        return [WeekViewModel(week, facility, user) for week in booking_period.weeks]
+
+    def save():
+        booking = Booking(date=free_slot(facility), user=username, facility=facility)
+        booking.clean()
+        booking.save()
+
+    def render(view):
+        def wrapper():
+            request = factory.get('/')
+            request.user = user
+            request.session = {}
+            view(request, facility)
+
+        return wrapper
+
+    return {
+        "week_view_models": cold(view_models),
+        "week_view_models_cached": view_models,
+        "get_user_quota": lambda: Booking.get_user_quota(username),
+        "booking_save": rolled_back(save),
+        "remove_old": rolled_back(Booking.remove_old),
+        "statistic_accumulate": rolled_back(lambda: Statistic.accumulate(
+            Booking.objects.filter(date__lte=Booking.expiration_threshold()))),
+        "statistic_roll_up": rolled_back(Statistic.roll_up),
+        "bookings_view": cold(render(views.bookings)),
+        "status_view": cold(render(views.status)),
+    }
+
+
+def run(username='benchmark', facility='g', repeat=10, names=None):
+    """Time the hot paths (or the given ones) and return the results by name"""
+    benchmarks = hot_paths(username, facility)
+
+    return {name: measure(function, repeat)
+            for name, function in sorted(benchmarks.items())
+            if not names or name in names}
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Return the regressions of results against baseline: benchmarks whose
+    median is more than threshold (share) slower or that need more queries.
+    """
+    regressions = []
+
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+
+        before = baseline[name]
+        if result["median_ms"] > before["median_ms"] * (1 + threshold):
+            regressions.append("{0}: median {1:.2f}ms, was {2:.2f}ms".format(
+                name, result["median_ms"], before["median_ms"]))
+        if result["queries"] > before["queries"]:
+            regressions.append("{0}: {1} queries, was {2}".format(
+                name, result["queries"], before["queries"]))
+
+    return regressions
@@ -0,0 +1,155 @@
+import threading
+import time
+
+from website import directory
+
+"""
+In-memory stand-in of the python-ldap module with a simulated network
+latency, so logins can be tested and benchmarked without an LDAP server.
+"""
+
+
+try:
+    # the exceptions of python-ldap, so django_auth_ldap handles them
+    from ldap import LDAPError, SERVER_DOWN, INVALID_CREDENTIALS, NO_SUCH_OBJECT
+except ImportError:
+    class LDAPError(Exception):
+        pass
+
+    class SERVER_DOWN(LDAPError):
+        pass
+
+    class INVALID_CREDENTIALS(LDAPError):
+        pass
+
+    class NO_SUCH_OBJECT(LDAPError):
+        pass
+
+
+class Directory(object):
+    """
+    Replacement of the ldap module: users maps DNs to (password, attributes).
+    The delays (in seconds) simulate the TLS handshake, a bind and a search.
+    """
+
+    SCOPE_BASE = 0
+    SCOPE_ONELEVEL = 1
+    SCOPE_SUBTREE = 2
+    OPT_DEBUG_LEVEL = 20481
+    OPT_REFERRALS = 8
+
+    LDAPError = LDAPError
+    SERVER_DOWN = SERVER_DOWN
+    INVALID_CREDENTIALS = INVALID_CREDENTIALS
+    NO_SUCH_OBJECT = NO_SUCH_OBJECT
+
+    def __init__(self, users, handshake_delay=0.0, bind_delay=0.0, search_delay=0.0):
+        self.users = users
+        self.handshake_delay = handshake_delay
+        self.bind_delay = bind_delay
+        self.search_delay = search_delay
+        self.lock = threading.Lock()
+        self.calls = {"initialize": 0, "start_tls_s": 0, "simple_bind_s": 0, "search_s": 0}
+
+    def count(self, call):
+        with self.lock:
+            self.calls[call] += 1
+
+    def initialize(self, uri, *args, **kwargs):
+        self.count("initialize")
+        return Connection(self)
+
+
+class Connection(object):
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.options = {}
+        self.bound_dn = None
+        self.down = False
+
+    def check(self):
+        if self.down:
+            raise SERVER_DOWN()
+
+    def set_option(self, option, value):
+        self.options[option] = value
+
+    def start_tls_s(self):
+        self.check()
+        self.directory.count("start_tls_s")
+        time.sleep(self.directory.handshake_delay)
+
+    def simple_bind_s(self, who='', cred=''):
+        self.check()
+        self.directory.count("simple_bind_s")
+        time.sleep(self.directory.bind_delay)
+
+        anonymous = not who and not cred
+        if not anonymous and (who not in self.directory.users or self.directory.users[who][0] != cred):
+            self.bound_dn = None
+            raise INVALID_CREDENTIALS()
+
+        self.bound_dn = who
+
+    def search_s(self, base, scope, filterstr='(objectClass=*)', attrlist=None):
+        self.check()
+        self.directory.count("search_s")
+        time.sleep(self.directory.search_delay)
+
+        if base not in self.directory.users:
+            raise NO_SUCH_OBJECT()
+
+        return [(base, self.directory.users[base][1])]
+
+
+def login(ldap, uri, dn, password, start_tls=True):
+    """
+    The calls of django_auth_ldap for a login with AUTH_LDAP_USER_DN_TEMPLATE:
+    connect, start TLS, bind as the user and read the user's attributes.
+    """
+    connection = ldap.initialize(uri)
+    connection.set_option(ldap.OPT_REFERRALS, 0)
+    if start_tls:
+        connection.start_tls_s()
+    connection.simple_bind_s(dn, password)
+
+    return connection.search_s(dn, ldap.SCOPE_BASE, '(objectClass=*)', ['*', '+'])
+
+
+def run(logins=200, users=50, threads=10, handshake_delay=0.02, bind_delay=0.002,
+        search_delay=0.002, pooled=True):
+    """
+    Log users in from several threads, with a new connection per login
+    (like django_auth_ldap) or pooled, and return timings and call counts.
+    """
+    dns = ["uid={0},ou=people,dc=hs-mannheim,dc=de".format(i) for i in range(0, users)]
+    standin = Directory({dn: ("secret", {"givenName": [b"Max"], "sn": [b"Mustermann"]})
+                         for dn in dns}, handshake_delay, bind_delay, search_delay)
+    ldap = directory.PooledLDAP(standin) if pooled else standin
+    durations = []
+    lock = threading.Lock()
+
+    def worker(number):
+        for i in range(number, logins, threads):
+            directory.reset_timings()
+            start = time.time()
+            login(ldap, "ldap://ldap.example.org", dns[i % users], "secret")
+            with lock:
+                durations.append(time.time() - start)
+
+    start = time.time()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(0, threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    total = time.time() - start
+
+    durations.sort()
+    return {
+        "logins_per_second": len(durations) / total,
+        "p50_ms": durations[len(durations) // 2] * 1000,
+        "p95_ms": durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000,
+        "calls": dict(standin.calls),
+    }
@@ -0,0 +1,229 @@
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+from website.models import BookingPeriod, Day
+
+"""
+Load generator simulating students at the start of a semester. Every
+student is a thread that logs in, looks at the bookings, books, cancels
+and watches the status page of a running instance over HTTP.
+"""
+
+# share of the actions of a student between two think times
+ACTIONS = [("bookings", 0.35), ("book", 0.3), ("cancel", 0.15), ("status", 0.2)]
+
+# share of the bookings that go to the popular blocks (Monday 10:00)
+HOT_SPOT_SHARE = 0.3
+
+CONFLICT_MESSAGE = "Buchung nicht möglich".encode('utf-8')
+QUOTA_MESSAGE = "Buchungskontingent reicht nicht aus".encode('utf-8')
+
+
+def bookable_slots(now=None):
+    """Return all future slots of the current booking period and the hot spots among them"""
+    now = now or datetime.now()
+    slots = [day.date.replace(hour=hour)
+             for week in BookingPeriod(now).weeks for day in week.days
+             for hour in range(Day.start_hour, Day.end_hour)
+             if day.date.replace(hour=hour) > now + timedelta(hours=1)]
+    hot_spots = [slot for slot in slots if slot.weekday() == 0 and slot.hour == 10]
+
+    return slots, hot_spots or slots
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Results(object):
+    """Thread-safe collection of latencies and outcomes per action"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(Counter)
+
+    def record(self, action, outcome, latency):
+        with self.lock:
+            self.latencies[action].append(latency)
+            self.outcomes[action][outcome] += 1
+
+    def summary(self, duration):
+        """Return the totals and per action statistics (latencies in ms)"""
+        actions = {}
+        for action, latencies in self.latencies.items():
+            actions[action] = dict(self.outcomes[action], **{
+                "requests": len(latencies),
+                "p50_ms": percentile(latencies, 0.5) * 1000,
+                "p95_ms": percentile(latencies, 0.95) * 1000,
+                "p99_ms": percentile(latencies, 0.99) * 1000,
+            })
+
+        total = Counter()
+        for outcomes in self.outcomes.values():
+            total.update(outcomes)
+        requests = sum(total.values()) or 1
+
+        return {
+            "requests_per_second": sum(total.values()) / float(duration),
+            "error_rate": (total["server_error"] + total["network_error"]) / float(requests),
+            "conflict_rate": total["conflict"] / float(requests),
+            "outcomes": dict(total),
+            "actions": actions,
+        }
+
+
+class Student(threading.Thread):
+    """One simulated student with its own session"""
+
+    def __init__(self, base_url, username, password, facility, deadline,
+                 think_time, results, slots, hot_spots, seed=None):
+        super(Student, self).__init__()
+        self.daemon = True
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.facility = facility
+        self.deadline = deadline
+        self.think_time = think_time
+        self.results = results
+        self.slots = slots
+        self.hot_spots = hot_spots
+        self.random = random.Random(seed)
+        self.booked = []
+        self.etag = None
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies))
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def request(self, action, path, data=None, headers=None):
+        """Send a request, record its outcome and return (status, body, ETag)"""
+        if data is not None:
+            data = dict(data, csrfmiddlewaretoken=self.csrf_token())
+            data = urlencode(data).encode('utf-8')
+
+        headers = dict(headers or {}, Referer=self.base_url + path)
+        start = time.time()
+
+        try:
+            response = self.opener.open(
+                Request(self.base_url + path, data=data, headers=headers), timeout=30)
+            status, body, etag = response.getcode(), response.read(), response.info().get('ETag')
+        except HTTPError as error:
+            status, body, etag = error.code, error.read(), None
+        except (URLError, IOError):
+            status, body, etag = None, b'', None
+
+        self.results.record(action, self.classify(status, body), time.time() - start)
+        return status, body, etag
+
+    @staticmethod
+    def classify(status, body):
+        if status is None:
+            return "network_error"
+        if status >= 500:
+            return "server_error"
+        if status == 403 and QUOTA_MESSAGE in body:
+            return "quota"
+        if status == 403 and CONFLICT_MESSAGE in body:
+            return "conflict"
+        if status >= 400:
+            return "rejected"
+        return "ok"
+
+    def login(self):
+        self.request("login_page", "/login/")
+        status, _, _ = self.request("login", "/login/", {
+            "username": self.username, "password": self.password})
+
+        return status == 200
+
+    def think(self):
+        time.sleep(min(self.random.expovariate(1.0 / self.think_time),
+                       max(self.deadline - time.time(), 0)))
+
+    def choose_action(self):
+        value = self.random.random()
+        for action, share in ACTIONS:
+            if value < share:
+                return action
+            value -= share
+        return ACTIONS[-1][0]
+
+    def book(self):
+        slots = self.hot_spots if self.random.random() < HOT_SPOT_SHARE else self.slots
+        slot = self.random.choice(slots)
+
+        status, _, _ = self.request("book", "/buchungen/{0}/".format(self.facility), {
+            "book": str(slot.timestamp())})
+        if status == 200:
+            self.booked.append(slot)
+
+    def cancel(self):
+        if not self.booked:
+            return self.book()
+
+        slot = self.booked.pop(self.random.randrange(len(self.booked)))
+        self.request("cancel", "/buchungen/{0}/".format(self.facility), {
+            "cancel": str(slot.timestamp())})
+
+    def watch_status(self):
+        headers = {'If-None-Match': self.etag} if self.etag else {}
+        _, _, etag = self.request("status", "/status/{0}/".format(self.facility), headers=headers)
+        self.etag = etag or self.etag
+
+    def run(self):
+        self.think()
+        if not self.login():
+            return
+
+        while time.time() < self.deadline:
+            action = self.choose_action()
+
+            if action == "bookings":
+                self.request("bookings", "/buchungen/{0}/".format(self.facility))
+            elif action == "book":
+                self.book()
+            elif action == "cancel":
+                self.cancel()
+            else:
+                self.watch_status()
+
+            self.think()
+
+
+def run(base_url, password, students=200, duration=60, think_time=5.0,
+        facility='g', seed=0):
+    """
+    Simulate the given number of students for duration seconds
+    against the instance at base_url and return the summary.
+    """
+    slots, hot_spots = bookable_slots()
+    results = Results()
+    deadline = time.time() + duration
+
+    threads = [Student(base_url, "9{0:06d}".format(i), password, facility, deadline,
+                       think_time, results, slots, hot_spots, seed + i)
+               for i in range(0, students)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(duration + 60)
+
+    return results.summary(duration)
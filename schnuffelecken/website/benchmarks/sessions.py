@@ -0,0 +1,59 @@
+from django.contrib.auth.models import User
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from website.db import QueryCounter
+
+"""
+Database writes caused by the sessions of the login/bookings flow
+with the different session engines.
+"""
+
+ENGINES = [
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.signed_cookies',
+]
+
+PASSWORD = "benchmark"
+
+
+def measure(engine, page_views=5, username="9999999"):
+    """
+    Log in, open the bookings page page_views times and log out. Return
+    the number of requests, all database writes and those to django_session.
+    """
+    settings = {
+        'SESSION_ENGINE': engine,
+        'AUTHENTICATION_BACKENDS': ['website.backends.LoadTestBackend'],
+        'LOAD_TEST_PASSWORD': PASSWORD,
+    }
+
+    # the user exists already, as after the first login
+    User.objects.get_or_create(username=username)
+
+    with override_settings(**settings):
+        client = Client()
+        bookings = reverse('bookings', kwargs={'facility': 'g'})
+        requests = [lambda: client.get(reverse('login')),
+                    lambda: client.post(reverse('login'), {
+                        'username': username, 'password': PASSWORD})]
+        requests += [lambda: client.get(bookings)] * page_views
+        requests += [lambda: client.get(reverse('logout'))]
+
+        writes = []
+        for request in requests:
+            with QueryCounter() as counter:
+                request()
+            writes.extend(counter.writes)
+
+    return {
+        "requests": len(requests),
+        "writes": len(writes),
+        "session_writes": len([sql for sql in writes if 'django_session' in sql]),
+    }
+
+
+def run(page_views=5):
+    return {engine: measure(engine, page_views) for engine in ENGINES}
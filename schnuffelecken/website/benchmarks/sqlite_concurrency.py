@@ -0,0 +1,178 @@
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from website.db import apply_pragmas
+
+"""
+Concurrency benchmark of the SQLite database with and without pragmas.
+Several processes (like mod_wsgi daemons) run the statements of the
+booking, cancellation and grid queries against a temporary database file,
+so neither Django nor the real database are involved.
+"""
+
+SCHEMA = [
+    'CREATE TABLE booking (id INTEGER PRIMARY KEY, user TEXT, facility TEXT, date TEXT, '
+    'UNIQUE (date, facility))',
+    'CREATE TABLE quota (id INTEGER PRIMARY KEY, user TEXT, week TEXT, bookings INTEGER, '
+    'UNIQUE (user, week))',
+    'CREATE TABLE version (facility TEXT PRIMARY KEY, version TEXT)',
+    "INSERT INTO version VALUES ('g', '0'), ('h', '0')",
+]
+
+START = datetime(2030, 3, 11)
+SLOTS = [START + timedelta(days=day, hours=hour)
+         for day in range(0, 26) if (START + timedelta(day)).weekday() < 5
+         for hour in range(8, 19)]
+
+
+def book(cursor, user, facility, date):
+    week = (date - timedelta(date.weekday())).strftime("%Y-%m-%d")
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute("INSERT INTO booking (user, facility, date) VALUES (?, ?, ?)",
+                       (user, facility, date.isoformat(" ")))
+        cursor.execute("UPDATE quota SET bookings = bookings + 1 WHERE user = ? AND week = ?",
+                       (user, week))
+        if not cursor.rowcount:
+            cursor.execute("INSERT INTO quota (user, week, bookings) VALUES (?, ?, 1)",
+                           (user, week))
+        cursor.execute("SELECT SUM(bookings) FROM quota WHERE user = ? AND week >= ?",
+                       (user, START.strftime("%Y-%m-%d")))
+        cursor.fetchall()
+        cursor.execute("UPDATE version SET version = ? WHERE facility = ?",
+                       (str(random.random()), facility))
+        cursor.execute("COMMIT")
+    except sqlite3.IntegrityError:
+        cursor.execute("ROLLBACK")
+        return "conflict"
+    except sqlite3.OperationalError:
+        cursor.execute("ROLLBACK")
+        raise
+
+    return "ok"
+
+
+def cancel(cursor, user, facility, date):
+    week = (date - timedelta(date.weekday())).strftime("%Y-%m-%d")
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute("DELETE FROM booking WHERE user = ? AND facility = ? AND date = ?",
+                       (user, facility, date.isoformat(" ")))
+        if cursor.rowcount:
+            cursor.execute("UPDATE quota SET bookings = bookings - 1 WHERE user = ? AND week = ?",
+                           (user, week))
+            cursor.execute("UPDATE version SET version = ? WHERE facility = ?",
+                           (str(random.random()), facility))
+        cursor.execute("COMMIT")
+    except sqlite3.OperationalError:
+        cursor.execute("ROLLBACK")
+        raise
+
+    return "ok"
+
+
+def grid(cursor, facility):
+    cursor.execute("SELECT version FROM version WHERE facility = ?", (facility,))
+    cursor.fetchall()
+    cursor.execute("SELECT date, user FROM booking WHERE facility = ? AND date >= ? AND date < ?",
+                   (facility, START.isoformat(" "), (START + timedelta(28)).isoformat(" ")))
+    cursor.fetchall()
+
+    return "ok"
+
+
+def worker(path, pragmas, duration, write_ratio, seed, results):
+    random.seed(seed)
+    connection = sqlite3.connect(path, isolation_level=None)
+    cursor = connection.cursor()
+    apply_pragmas(cursor, pragmas)
+
+    user = "user{0}".format(seed)
+    booked = []
+    latencies = {"read": [], "write": []}
+    outcomes = {"ok": 0, "conflict": 0, "locked": 0}
+    deadline = time.time() + duration
+
+    while time.time() < deadline:
+        facility = random.choice("gh")
+        is_write = random.random() < write_ratio
+        start = time.time()
+
+        try:
+            if not is_write:
+                outcome = grid(cursor, facility)
+            elif booked and (len(booked) >= 10 or random.random() < 0.5):
+                outcome = cancel(cursor, user, *booked.pop(random.randrange(len(booked))))
+            else:
+                # hot spots: half of the bookings go to the first slots of the week
+                slot = random.choice(SLOTS[:5] if random.random() < 0.5 else SLOTS)
+                outcome = book(cursor, user, facility, slot)
+                if outcome == "ok":
+                    booked.append((facility, slot))
+        except sqlite3.OperationalError:
+            outcome = "locked"
+
+        outcomes[outcome] += 1
+        latencies["write" if is_write else "read"].append(time.time() - start)
+
+    connection.close()
+    results.put((latencies, outcomes))
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(pragmas, processes=8, duration=5.0, write_ratio=0.2):
+    """
+    Run the benchmark with the given pragmas and return throughput,
+    latency percentiles (in ms) and the number of lock errors.
+    """
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "benchmark.sqlite3")
+
+    try:
+        connection = sqlite3.connect(path, isolation_level=None)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.close()
+
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(
+            target=worker, args=(path, pragmas, duration, write_ratio, seed, results))
+            for seed in range(0, processes)]
+
+        for process in workers:
+            process.start()
+
+        collected = [results.get() for _ in workers]
+
+        for process in workers:
+            process.join()
+    finally:
+        shutil.rmtree(directory)
+
+    reads = [latency for latencies, _ in collected for latency in latencies["read"]]
+    writes = [latency for latencies, _ in collected for latency in latencies["write"]]
+    outcomes = {key: sum(result[key] for _, result in collected)
+                for key in ("ok", "conflict", "locked")}
+
+    return {
+        "operations_per_second": (len(reads) + len(writes)) / duration,
+        "writes_per_second": len(writes) / duration,
+        "read_p50_ms": percentile(reads, 0.5) * 1000,
+        "read_p95_ms": percentile(reads, 0.95) * 1000,
+        "write_p50_ms": percentile(writes, 0.5) * 1000,
+        "write_p95_ms": percentile(writes, 0.95) * 1000,
+        "conflicts": outcomes["conflict"],
+        "locked": outcomes["locked"],
+    }
@@ -0,0 +1,71 @@
+import re
+
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template.loader import get_template
+
+from website.storage import compress, is_compressible
+
+"""
+Size and request-count report of the static files the pages load: the
+bytes sent with and without the precompressed variants and whether the
+files are referenced under hashed names (cacheable forever).
+"""
+
+PAGES = ['website/login.html', 'website/bookings.html', 'website/status.html']
+
+STATIC_TAG = re.compile(r"""{%\s*static\s+['"]([^'"]+)['"]\s*%}""")
+EXTENDS_TAG = re.compile(r"""{%\s*extends\s+['"]([^'"]+)['"]\s*%}""")
+# stylesheets, scripts and images loaded from other servers (not links)
+EXTERNAL_URL = re.compile(r"""(?:<link[^>]*\shref|\ssrc)=["'](https?://[^"']+)["']""")
+
+
+def references(template_name):
+    """Return the static files and external URLs loaded by a template and the ones it extends"""
+    static, external = [], []
+
+    while template_name:
+        source = get_template(template_name).template.source
+        static.extend(path for path in STATIC_TAG.findall(source) if path not in static)
+        external.extend(url for url in EXTERNAL_URL.findall(source) if url not in external)
+        parent = EXTENDS_TAG.search(source)
+        template_name = parent.group(1) if parent else None
+
+    return static, external
+
+
+def asset(path):
+    """Return the URL, the size and the sizes of the compressed variants of a static file"""
+    with open(finders.find(path), 'rb') as original:
+        content = original.read()
+
+    variants = compress(content) if is_compressible(path) else {}
+    url = staticfiles_storage.url(path)
+
+    return {
+        "url": url,
+        "hashed": url != staticfiles_storage.base_url + path,
+        "bytes": len(content),
+        "gz": len(variants['gz']) if 'gz' in variants else None,
+        "br": len(variants['br']) if 'br' in variants else None,
+        "sent": min([len(content)] + [len(data) for data in variants.values()]),
+    }
+
+
+def run(pages=None):
+    """Return the assets of every page and the totals of a first (uncached) page view"""
+    results = {}
+
+    for page in pages or PAGES:
+        static, external = references(page)
+        assets = {path: asset(path) for path in static}
+        results[page] = {
+            "assets": assets,
+            "external": external,
+            "requests": len(static) + len(external),
+            "bytes": sum(item["bytes"] for item in assets.values()),
+            "sent": sum(item["sent"] for item in assets.values()),
+            "revalidated": len([item for item in assets.values() if not item["hashed"]]),
+        }
+
+    return results
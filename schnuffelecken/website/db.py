@@ -0,0 +1,79 @@
+import re
+import time
+
+from django.conf import settings
+from django.db import connection as default_connection
+
+"""
+Database tuning applied whenever Django opens a new connection
+and instrumentation of the queries executed on it.
+"""
+
+SQLITE_PRAGMAS = (
+    'journal_mode',
+    'busy_timeout',
+    'synchronous',
+    'cache_size',
+    'mmap_size',
+    'temp_store',
+    'wal_autocheckpoint',
+)
+
+PRAGMA_VALUE = re.compile(r'^-?[A-Za-z0-9_]+$')
+
+
+def apply_pragmas(cursor, pragmas):
+    """Execute the given SQLite pragmas (name -> value) on a cursor"""
+    for name, value in pragmas.items():
+        if name not in SQLITE_PRAGMAS or not PRAGMA_VALUE.match(str(value)):
+            raise ValueError("Unsupported pragma: {0} = {1}".format(name, value))
+
+        cursor.execute("PRAGMA {0} = {1}".format(name, value))
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Receiver of connection_created, applies settings.SQLITE_PRAGMAS"""
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+
+    if connection.vendor == 'sqlite' and pragmas:
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor, pragmas)
+
+
+class QueryCounter(object):
+    """
+    Context manager counting the queries executed on a connection, their
+    total time (in seconds) and the INSERT, UPDATE and DELETE statements.
+    It wraps the execution instead of using the debug cursor, which logs
+    and formats every statement, so it is cheap enough for every request.
+    The pragmas of a connection opened in the block are not counted.
+    """
+
+    def __init__(self, connection=default_connection):
+        self.connection = connection
+        self.count = 0
+        self.time = 0.0
+        self.writes = []
+
+    def __enter__(self):
+        self.wrapper = self.connection.execute_wrapper(self)
+        self.wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.wrapper.__exit__(exc_type, exc_value, traceback)
+
+    def __call__(self, execute, sql, params, many, context):
+        statement = sql.lstrip().split(' ', 1)[0].upper()
+
+        if statement == 'PRAGMA':
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.time += time.perf_counter() - start
+            self.count += 1
+            if statement in ('INSERT', 'UPDATE', 'DELETE'):
+                self.writes.append(sql)
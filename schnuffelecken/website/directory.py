@@ -0,0 +1,125 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+"""
+Reuse of LDAP connections and caching of user attributes for the login
+(see website/ldap_backend.py). Works with the python-ldap module as well
+as with the stand-in of website/benchmarks/ldap_directory.py.
+"""
+
+_timings = threading.local()
+
+
+def reset_timings():
+    _timings.steps = {"bind": 0.0, "search": 0.0}
+
+
+def timings():
+    """Return the time (in seconds) spent per step since reset_timings()"""
+    return dict(getattr(_timings, 'steps', None) or {"bind": 0.0, "search": 0.0})
+
+
+def timed(step, function, *args, **kwargs):
+    start = time.time()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        steps = getattr(_timings, 'steps', None)
+        if steps is not None:
+            steps[step] = steps.get(step, 0.0) + time.time() - start
+
+
+class PooledConnection(object):
+    """
+    Persistent LDAP connection: TLS is started once, options are set once
+    and a lost connection is opened again. Base searches (the attributes
+    of a user) are cached per bound DN (also the anonymous one) for
+    settings.LDAP_ATTRIBUTE_CACHE_TIMEOUT_IN_SECONDS.
+    """
+
+    def __init__(self, module, uri, args, kwargs):
+        self.module = module
+        self.uri = uri
+        self.args = args
+        self.kwargs = kwargs
+        self.options = {}
+        self.tls = False
+        self.bound_dn = None
+        self.connection = module.initialize(uri, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def reconnect(self):
+        self.connection = self.module.initialize(self.uri, *self.args, **self.kwargs)
+        for option, value in self.options.items():
+            self.connection.set_option(option, value)
+        if self.tls:
+            self.connection.start_tls_s()
+
+    def set_option(self, option, value):
+        if self.options.get(option) != value:
+            self.connection.set_option(option, value)
+            self.options[option] = value
+
+    def start_tls_s(self):
+        if not self.tls:
+            self.connection.start_tls_s()
+            self.tls = True
+
+    def simple_bind_s(self, who='', cred='', *args, **kwargs):
+        self.bound_dn = None
+
+        try:
+            result = timed("bind", self.connection.simple_bind_s, who, cred, *args, **kwargs)
+        except self.module.SERVER_DOWN:
+            self.reconnect()
+            result = timed("bind", self.connection.simple_bind_s, who, cred, *args, **kwargs)
+
+        self.bound_dn = who
+        return result
+
+    def search_s(self, base, scope, filterstr='(objectClass=*)', attrlist=None, *args, **kwargs):
+        timeout = getattr(settings, 'LDAP_ATTRIBUTE_CACHE_TIMEOUT_IN_SECONDS', 0)
+        if not timeout or scope != self.module.SCOPE_BASE or self.bound_dn is None:
+            return timed("search", self.connection.search_s,
+                         base, scope, filterstr, attrlist, *args, **kwargs)
+
+        key = "ldap:{0}".format(hashlib.md5(repr(
+            (self.uri, self.bound_dn, base, filterstr, attrlist)).encode('utf-8')).hexdigest())
+        results = cache.get(key)
+
+        if results is None:
+            results = timed("search", self.connection.search_s,
+                            base, scope, filterstr, attrlist, *args, **kwargs)
+            cache.set(key, results, timeout)
+
+        return results
+
+
+class PooledLDAP(object):
+    """
+    Wrapper of the ldap module handing out one persistent connection
+    per thread and server instead of a new one for every login.
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self.module, name)
+
+    def initialize(self, uri, *args, **kwargs):
+        connections = getattr(self.local, 'connections', None)
+        if connections is None:
+            connections = self.local.connections = {}
+
+        if uri not in connections:
+            connections[uri] = PooledConnection(self.module, uri, args, kwargs)
+
+        return connections[uri]
@@ -0,0 +1,76 @@
+import json
+import time
+from datetime import datetime
+
+from django.conf import settings
+
+from website.models import BookingPeriod, FacilityVersion
+from website.viewmodels import block_data
+
+"""
+Server-sent events to update the booking tables in place.
+Instead of a message broker, every stream polls the cheap FacilityVersion
+marker of its facility and only loads the (cached) occupancy if it changed.
+A stream ends after settings.EVENT_STREAM_DURATION_IN_SECONDS to release
+the WSGI thread, the browser reconnects on its own and sends the version
+it knows as Last-Event-ID.
+"""
+
+
+def load_blocks(facility, user):
+    """Return the blocks of the current BookingPeriod by timestamp"""
+    booking_period = BookingPeriod(datetime.now())
+    booking_period.load_bookings(facility)
+
+    blocks = {}
+    for week in booking_period.weeks:
+        for day in week.days:
+            for block in day.get_bookings(facility, user):
+                blocks[block.timestamp] = block
+
+    return booking_period.version, blocks
+
+
+def changed_blocks(old, new):
+    """Return all blocks of new whose state differs from old"""
+    return [block for timestamp, block in sorted(new.items())
+            if type(old.get(timestamp)) is not type(block)]
+
+
+def format_event(version, blocks):
+    """Format blocks as event of type "slots"."""
+    data = json.dumps([block_data(block) for block in blocks])
+
+    return "id: {0}\nevent: slots\ndata: {1}\n\n".format(version, data)
+
+
+def slot_events(facility, user, version=None):
+    """
+    Generate the event stream for a facility. If the client's version
+    differs from the current one, all blocks are sent first.
+    """
+    current, blocks = load_blocks(facility, user)
+
+    yield "retry: {0}\n\n".format(settings.EVENT_STREAM_RETRY_IN_MILLISECONDS)
+
+    if version and version != current:
+        yield format_event(current, changed_blocks({}, blocks))
+
+    deadline = time.time() + settings.EVENT_STREAM_DURATION_IN_SECONDS
+
+    while time.time() < deadline:
+        time.sleep(settings.EVENT_STREAM_POLL_INTERVAL_IN_SECONDS)
+
+        if FacilityVersion.get(facility) == current:
+            # comment line, lets the server notice closed connections
+            yield ":\n\n"
+            continue
+
+        current, new_blocks = load_blocks(facility, user)
+        changed = changed_blocks(blocks, new_blocks)
+        blocks = new_blocks
+
+        if changed:
+            yield format_event(current, changed)
+        else:
+            yield ":\n\n"
@@ -0,0 +1,99 @@
+import csv
+import json
+from datetime import timedelta
+
+from django.db.models import Q
+
+from website.models import Booking, HourlyStatistic, Statistic
+
+"""
+Export of bookings and statistics as CSV or JSON lines. The rows are
+read in chunks (keyset pagination by primary key, never OFFSET) and
+written as they come, so any amount of history needs constant memory.
+"""
+
+KINDS = {
+    'bookings': (Booking, ('date', 'facility', 'user')),
+    'statistics': (Statistic, ('year', 'calendar_week', 'facility', 'bookings')),
+    'hourly': (HourlyStatistic, ('date', 'hour', 'facility', 'bookings')),
+}
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+CHUNK_SIZE = 2000
+
+
+def queryset(kind, facility=None, start=None, end=None):
+    """Return the rows of kind of a facility (default: all) from start to end (dates, both included)"""
+    model = KINDS[kind][0]
+    rows = model.objects.all()
+
+    if facility:
+        rows = rows.filter(facility=facility)
+
+    if kind == 'statistics':
+        # statistics store the calendar year with the ISO week: the first
+        # days of January may be in week 52/53, the last of December in week 1
+        if start:
+            iso_year, week = start.isocalendar()[:2]
+            week = 1 if iso_year < start.year else week
+            rows = rows.filter(Q(year__gt=start.year) | Q(year=start.year, calendar_week__gte=week))
+        if end:
+            iso_year, week = end.isocalendar()[:2]
+            week = 53 if iso_year > end.year else week
+            rows = rows.filter(Q(year__lt=end.year) | Q(year=end.year, calendar_week__lte=week))
+    else:
+        if start:
+            rows = rows.filter(date__gte=start)
+        if end:
+            rows = rows.filter(date__lt=end + timedelta(1))
+
+    return rows
+
+
+def rows(kind, facility=None, start=None, end=None, chunk_size=CHUNK_SIZE):
+    """Yield the values of the fields of kind, reading chunk_size rows per query"""
+    values = queryset(kind, facility, start, end).order_by('pk').values_list(
+        'pk', *KINDS[kind][1])
+    last = 0
+
+    while True:
+        chunk = list(values.filter(pk__gt=last)[:chunk_size])
+
+        for row in chunk:
+            yield row[1:]
+
+        if len(chunk) < chunk_size:
+            return
+
+        last = chunk[-1][0]
+
+
+def value(field):
+    """Dates and times in ISO 8601, everything else as it is"""
+    return field.isoformat() if hasattr(field, 'isoformat') else field
+
+
+class Echo(object):
+    """File-like object that returns what is written, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def lines(kind, format='csv', facility=None, start=None, end=None, chunk_size=CHUNK_SIZE):
+    """Yield the export of kind in format line by line (CSV with a header)"""
+    fields = KINDS[kind][1]
+    values = rows(kind, facility, start, end, chunk_size)
+
+    if format == 'jsonl':
+        for row in values:
+            yield json.dumps(dict(zip(fields, [value(field) for field in row]))) + "\n"
+    else:
+        writer = csv.writer(Echo(), lineterminator="\n")
+        yield writer.writerow(fields)
+        for row in values:
+            yield writer.writerow([value(field) for field in row])
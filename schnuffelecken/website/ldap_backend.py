@@ -0,0 +1,45 @@
+import logging
+import time
+
+from django_auth_ldap.backend import LDAPBackend
+
+from website import directory
+
+"""
+LDAP authentication of students and employees.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class PooledLDAPBackend(LDAPBackend):
+    """
+    LDAPBackend reusing one connection per thread (instead of a new TLS
+    handshake for every login) and caching the user attributes for a short
+    time. The time of bind, search and attribute sync is logged per login.
+    """
+
+    _pooled_ldap = None
+
+    @property
+    def ldap(self):
+        if PooledLDAPBackend._pooled_ldap is None:
+            PooledLDAPBackend._pooled_ldap = directory.PooledLDAP(
+                super(PooledLDAPBackend, self).ldap)
+
+        return PooledLDAPBackend._pooled_ldap
+
+    def authenticate(self, *args, **kwargs):
+        directory.reset_timings()
+        start = time.time()
+
+        user = super(PooledLDAPBackend, self).authenticate(*args, **kwargs)
+
+        total = time.time() - start
+        steps = directory.timings()
+        logger.info("ldap login user=%s success=%s bind_ms=%.1f search_ms=%.1f sync_ms=%.1f total_ms=%.1f",
+                    kwargs.get('username'), user is not None, steps["bind"] * 1000,
+                    steps["search"] * 1000, (total - steps["bind"] - steps["search"]) * 1000,
+                    total * 1000)
+
+        return user
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from website.benchmarks import booking_engine
+
+from datetime import datetime
+import json
+
+
+class Command(BaseCommand):
+    help = ('Time the hot paths of the booking engine on a seeded test database '
+            '(the real database is not touched) and optionally compare with a baseline.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=5000,
+                            help='Number of seeded bookings.')
+        parser.add_argument('--users', type=int, default=500,
+                            help='Number of seeded users.')
+        parser.add_argument('--facilities', default='gh',
+                            help='Seeded facilities, e.g. "gh".')
+        parser.add_argument('--occupancy', type=float, default=0.5,
+                            help='Share of the upcoming slots that are booked.')
+        parser.add_argument('--repeat', type=int, default=10,
+                            help='Repetitions of every benchmark.')
+        parser.add_argument('--output',
+                            help='Write the results to this JSON file.')
+        parser.add_argument('--compare',
+                            help='Compare with the results in this JSON file.')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Share by which a median may grow before it is a regression.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)['results']
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        try:
+            booking_engine.seed(options['bookings'], options['users'],
+                                options['facilities'], options['occupancy'])
+            results = booking_engine.run(
+                facility=options['facilities'][0], repeat=options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write("{0:<26} {1:>9} {2:>9} {3:>9} {4:>8}".format(
+            "benchmark", "min", "median", "mean", "queries"))
+        for name, result in sorted(results.items()):
+            self.stdout.write(
+                "{0:<26} {min_ms:>7.2f}ms {median_ms:>7.2f}ms {mean_ms:>7.2f}ms {queries:>8}".format(
+                    name, **result))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({
+                    "date": datetime.now().isoformat(),
+                    "options": {key: options[key] for key in (
+                        'bookings', 'users', 'facilities', 'occupancy', 'repeat')},
+                    "results": results,
+                }, output, indent=2, sort_keys=True)
+
+        if baseline is not None:
+            regressions = booking_engine.compare(results, baseline, options['threshold'])
+
+            for regression in regressions:
+                self.stderr.write(regression)
+            if regressions:
+                raise CommandError('{0} regression(s) against {1}'.format(
+                    len(regressions), options['compare']))
+
+            self.stdout.write("No regressions against {0}".format(options['compare']))
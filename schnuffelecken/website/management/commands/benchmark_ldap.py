@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from website.benchmarks import ldap_directory
+
+
+class Command(BaseCommand):
+    help = ('Compare logins with a new LDAP connection each against pooled connections, '
+            'using an in-memory LDAP stand-in with simulated latency.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200)
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--threads', type=int, default=10)
+        parser.add_argument('--handshake-delay', type=float, default=0.02,
+                            help='Simulated duration of a TLS handshake in seconds.')
+        parser.add_argument('--bind-delay', type=float, default=0.002)
+        parser.add_argument('--search-delay', type=float, default=0.002)
+
+    def handle(self, *args, **options):
+        self.stdout.write("{0:<10} {1:>9} {2:>9} {3:>9} {4:>11} {5:>6} {6:>7}".format(
+            "mode", "logins/s", "p50", "p95", "connections", "binds", "searches"))
+
+        for mode in ("new", "pooled"):
+            result = ldap_directory.run(
+                options['logins'], options['users'], options['threads'],
+                options['handshake_delay'], options['bind_delay'], options['search_delay'],
+                pooled=mode == "pooled")
+
+            self.stdout.write("{0:<10} {1:>9.1f} {2:>7.1f}ms {3:>7.1f}ms {4:>11} {5:>6} {6:>7}".format(
+                mode, result["logins_per_second"], result["p50_ms"], result["p95_ms"],
+                result["calls"]["initialize"], result["calls"]["simple_bind_s"],
+                result["calls"]["search_s"]))
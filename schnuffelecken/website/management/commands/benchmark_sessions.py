@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from website.benchmarks import sessions
+
+
+class Command(BaseCommand):
+    help = ('Count the database writes of a login, several bookings page views and '
+            'a logout with every session engine (on a test database).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-views', type=int, default=5,
+                            help='Number of bookings page views per session.')
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        try:
+            results = sessions.run(options['page_views'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write("{0:<50} {1:>8} {2:>7} {3:>15} {4:>18}".format(
+            "engine", "requests", "writes", "session writes", "writes per request"))
+        for engine in sessions.ENGINES:
+            result = results[engine]
+            self.stdout.write("{0:<50} {requests:>8} {writes:>7} {session_writes:>15} {1:>18.2f}".format(
+                engine, result["writes"] / float(result["requests"]), **result))
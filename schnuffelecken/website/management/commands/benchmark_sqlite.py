@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from website.benchmarks import sqlite_concurrency
+
+
+class Command(BaseCommand):
+    help = 'Compare booking throughput and latency of SQLite with and without settings.SQLITE_PRAGMAS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8,
+                            help='Number of concurrent processes.')
+        parser.add_argument('--duration', type=float, default=5.0,
+                            help='Duration of each run in seconds.')
+        parser.add_argument('--write-ratio', type=float, default=0.2,
+                            help='Share of bookings and cancellations among all requests.')
+
+    def handle(self, *args, **options):
+        profiles = [
+            ("defaults", {}),
+            ("SQLITE_PRAGMAS", getattr(settings, 'SQLITE_PRAGMAS', None) or {}),
+        ]
+
+        self.stdout.write("{0:<16} {1:>8} {2:>9} {3:>9} {4:>9} {5:>9} {6:>9} {7:>8}".format(
+            "profile", "ops/s", "writes/s", "read p50", "read p95", "write p50", "write p95", "locked"))
+
+        for name, pragmas in profiles:
+            result = sqlite_concurrency.run(
+                pragmas, options['processes'], options['duration'], options['write_ratio'])
+
+            self.stdout.write(
+                "{0:<16} {operations_per_second:>8.0f} {writes_per_second:>9.0f} "
+                "{read_p50_ms:>7.2f}ms {read_p95_ms:>7.2f}ms "
+                "{write_p50_ms:>7.2f}ms {write_p95_ms:>7.2f}ms {locked:>8}".format(name, **result))
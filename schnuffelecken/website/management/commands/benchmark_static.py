@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from website.benchmarks import static_assets
+
+
+class Command(BaseCommand):
+    help = ('Report the static files of every page: requests, sizes with and without '
+            'the precompressed variants and whether they are cached forever.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('pages', nargs='*',
+                            help='Templates of the pages (default: login, bookings and status).')
+
+    def handle(self, *args, **options):
+        results = static_assets.run(options['pages'])
+
+        for page, result in sorted(results.items()):
+            self.stdout.write(page)
+            for path, item in sorted(result["assets"].items()):
+                self.stdout.write("  {0:<55} {1:>9} {2:>9} {3:>9}  {4}".format(
+                    path, item["bytes"], item["gz"] or "-", item["br"] or "-",
+                    "hashed" if item["hashed"] else "plain"))
+            for url in result["external"]:
+                self.stdout.write("  {0:<55} {1:>9}".format(url, "external"))
+            self.stdout.write(
+                "  {requests} requests, {bytes} bytes, {sent} bytes sent, "
+                "{revalidated} revalidated on every view".format(**result))
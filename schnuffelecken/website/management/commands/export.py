@@ -0,0 +1,64 @@
+import gzip
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from website.export import CHUNK_SIZE, FORMATS, KINDS, lines
+from website.models import FACILITIES
+
+
+class Command(BaseCommand):
+    help = ('Export bookings, weekly or hourly statistics as CSV or JSON lines, '
+            'streamed in constant memory.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(KINDS))
+        parser.add_argument('--format', default='csv', choices=sorted(FORMATS))
+        parser.add_argument('--facility', choices=FACILITIES,
+                            help='Only export this facility (default: all).')
+        parser.add_argument('--from', dest='start', type=self.parse_day,
+                            help='First day (YYYY-MM-DD).')
+        parser.add_argument('--to', dest='end', type=self.parse_day,
+                            help='Last day (YYYY-MM-DD).')
+        parser.add_argument('--output', help='Write to this file instead of stdout.')
+        parser.add_argument('--gzip', action='store_true',
+                            help='Compress the output file (default for files ending with .gz).')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Number of rows read per query.')
+
+    @staticmethod
+    def parse_day(value):
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+
+        if day is None:
+            raise CommandError('Invalid date: {0}'.format(value))
+
+        return day
+
+    def handle(self, *args, **options):
+        output = options['output']
+        compress = options['gzip'] or (output or '').endswith('.gz')
+
+        if compress and not output:
+            raise CommandError('Compressed output needs --output')
+
+        if options['chunk_size'] < 1:
+            raise CommandError('Chunk size must be positive')
+
+        exported = lines(options['kind'], options['format'], options['facility'],
+                         options['start'], options['end'], options['chunk_size'])
+
+        if not output:
+            for line in exported:
+                self.stdout.write(line, ending='')
+            return
+
+        opener = gzip.open if compress else open
+        with opener(output, 'wt', encoding='utf-8', newline='') as target:
+            for line in exported:
+                target.write(line)
+
+        self.stdout.write(self.style.SUCCESS('Exported {0} to {1}'.format(options['kind'], output)))
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from website.benchmarks import load
+
+import json
+
+
+class Command(BaseCommand):
+    help = ('Simulate students booking at the start of a semester against a running '
+            'instance (with website.backends.LoadTestBackend enabled).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Base URL of the instance, e.g. http://localhost:8000')
+        parser.add_argument('--students', type=int, default=200,
+                            help='Number of concurrent students.')
+        parser.add_argument('--duration', type=float, default=60,
+                            help='Duration of the test in seconds.')
+        parser.add_argument('--think-time', type=float, default=5.0,
+                            help='Mean pause of a student between two requests in seconds.')
+        parser.add_argument('--facility', default='g', choices=['g', 'h'])
+        parser.add_argument('--password', default=getattr(settings, 'LOAD_TEST_PASSWORD', None),
+                            help='Password of the LoadTestBackend (default: settings.LOAD_TEST_PASSWORD).')
+        parser.add_argument('--output', help='Write the summary to this JSON file.')
+
+    def handle(self, *args, **options):
+        if not options['password']:
+            raise CommandError('No password for the LoadTestBackend, set LOAD_TEST_PASSWORD or --password')
+
+        summary = load.run(options['url'], options['password'], options['students'],
+                           options['duration'], options['think_time'], options['facility'])
+
+        self.stdout.write("{0:<12} {1:>8} {2:>8} {3:>9} {4:>6} {5:>7} {6:>9} {7:>9} {8:>9}".format(
+            "action", "requests", "ok", "conflict", "quota", "errors", "p50", "p95", "p99"))
+        for action, result in sorted(summary["actions"].items()):
+            self.stdout.write(
+                "{0:<12} {1:>8} {2:>8} {3:>9} {4:>6} {5:>7} {6:>7.1f}ms {7:>7.1f}ms {8:>7.1f}ms".format(
+                    action, result["requests"], result.get("ok", 0), result.get("conflict", 0),
+                    result.get("quota", 0),
+                    result.get("server_error", 0) + result.get("network_error", 0),
+                    result["p50_ms"], result["p95_ms"], result["p99_ms"]))
+
+        self.stdout.write("{0:.1f} requests/s, error rate {1:.2%}, conflict rate {2:.2%}".format(
+            summary["requests_per_second"], summary["error_rate"], summary["conflict_rate"]))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(summary, output, indent=2, sort_keys=True)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from website.models import QuotaUsage
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the quota counters of all users from their bookings.'
+
+    def handle(self, *args, **options):
+        counters = QuotaUsage.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            'Rebuilt {0} quota counters'.format(counters)))
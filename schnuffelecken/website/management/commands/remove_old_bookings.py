@@ -1,11 +1,64 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from website.models import Booking
 
+from datetime import datetime
+import time
+
 
 class Command(BaseCommand):
     help = 'Remove bookings older than n days. Can be configured by setting.OLD_BOOKINGS_EXPIRATION_IN_DAYS.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.OLD_BOOKINGS_BATCH_SIZE,
+            help='Number of bookings removed per transaction.')
+        parser.add_argument(
+            '--until', type=self.parse_date,
+            help='Only remove bookings up to this date (YYYY-MM-DD or YYYY-MM-DDTHH:MM), '
+                 'must not be later than the expiration threshold.')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many bookings would be removed.')
+
+    @staticmethod
+    def parse_date(value):
+        for pattern in ("%Y-%m-%dT%H:%M", "%Y-%m-%d"):
+            try:
+                return datetime.strptime(value, pattern)
+            except ValueError:
+                pass
+
+        raise CommandError('Invalid date: {0}'.format(value))
+
     def handle(self, *args, **options):
-        removed_bookings = Booking.remove_old()
+        threshold = Booking.expiration_threshold()
+        until = options['until'] or threshold
+        batch_size = options['batch_size']
+
+        if until > threshold:
+            raise CommandError('Bookings newer than {0:%Y-%m-%d %H:%M} have not expired yet'.format(
+                threshold))
+
+        if batch_size < 1:
+            raise CommandError('Batch size must be positive')
+
+        if options['dry_run']:
+            count = Booking.objects.filter(date__lte=until).count()
+            self.stdout.write('Would remove {0} bookings up to {1:%Y-%m-%d %H:%M}'.format(
+                count, until))
+            return
+
+        start = time.time()
+        removed_bookings = 0
+
+        for removed in Booking.remove_old_in_batches(batch_size, until):
+            removed_bookings += removed
+            self.stdout.write('Removed batch of {0} bookings ({1} total, {2:.0f} rows/s)'.format(
+                removed, removed_bookings, removed_bookings / max(time.time() - start, 1e-6)))
+
+        duration = time.time() - start
+
         self.stdout.write(self.style.SUCCESS(
-            'Removed {0} bookings'.format(removed_bookings)))
+            'Removed {0} bookings in {1:.2f}s ({2:.0f} rows/s)'.format(
+                removed_bookings, duration, removed_bookings / max(duration, 1e-6))))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from website.models import Statistic
+
+
+class Command(BaseCommand):
+    help = 'Accumulate the bookings that have started since the last run into the statistics.'
+
+    def handle(self, *args, **options):
+        bookings = Statistic.roll_up()
+        self.stdout.write(self.style.SUCCESS(
+            'Accumulated {0} bookings'.format(bookings)))
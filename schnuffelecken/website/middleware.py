@@ -0,0 +1,35 @@
+import logging
+
+from django.conf import settings
+
+from website.db import QueryCounter
+
+"""
+Per request instrumentation of the database access.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCountMiddleware(object):
+    """
+    Count the SQL queries of every request and the time spent on them.
+    Both are logged (logger website.middleware, level INFO) and, if
+    settings.QUERY_COUNT_HEADER is set, sent as Server-Timing header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+
+        logger.info("%s %s %s queries=%d db_time_ms=%.1f", request.method, request.path,
+                    response.status_code, counter.count, counter.time * 1000)
+
+        if getattr(settings, 'QUERY_COUNT_HEADER', False):
+            response['Server-Timing'] = 'db;desc="{0} queries";dur={1:.1f}'.format(
+                counter.count, counter.time * 1000)
+
+        return response
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 2.2.28 on 2026-10-17 23:01
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0006_auto_20170329_1045'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacilityVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facility', models.CharField(max_length=20, unique=True)),
+                ('version', models.CharField(max_length=32)),
+                ('modified', models.DateTimeField()),
+            ],
+        ),
+    ]
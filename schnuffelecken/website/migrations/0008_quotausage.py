@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 2.2.28 on 2026-10-17 23:04
+from __future__ import unicode_literals
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def count_existing_bookings(apps, schema_editor):
+    Booking = apps.get_model('website', 'Booking')
+    QuotaUsage = apps.get_model('website', 'QuotaUsage')
+
+    counts = Counter(
+        (user, (date - timedelta(date.weekday())).date())
+        for user, date in Booking.objects.values_list('user', 'date').iterator())
+
+    QuotaUsage.objects.bulk_create(
+        QuotaUsage(user=user, week=week, bookings=bookings)
+        for (user, week), bookings in counts.items())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0007_facilityversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuotaUsage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user', models.CharField(max_length=20)),
+                ('week', models.DateField()),
+                ('bookings', models.PositiveSmallIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='quotausage',
+            unique_together=set([('user', 'week')]),
+        ),
+        migrations.RunPython(count_existing_bookings, migrations.RunPython.noop),
+    ]
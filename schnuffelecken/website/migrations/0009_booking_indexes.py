@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 2.2.28 on 2026-10-17 23:10
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0008_quotausage'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='booking',
+            index_together=set([('facility', 'date', 'user'), ('user', 'date')]),
+        ),
+    ]
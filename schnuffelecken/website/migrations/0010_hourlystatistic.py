@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 2.2.28 on 2026-10-17 23:27
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0009_booking_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlyStatistic',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('weekday', models.PositiveSmallIntegerField()),
+                ('facility', models.CharField(max_length=20)),
+                ('bookings', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': set([('date', 'hour', 'facility')]),
+                'index_together': set([('date', 'facility', 'weekday', 'hour', 'bookings')]),
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 2.2.28 on 2026-10-17 23:30
+from __future__ import unicode_literals
+
+from collections import Counter
+from datetime import datetime
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def roll_up_started_bookings(apps, schema_editor):
+    """
+    Accumulate the bookings that have started: until now they were
+    only accumulated when they were removed.
+    """
+    Booking = apps.get_model('website', 'Booking')
+    Statistic = apps.get_model('website', 'Statistic')
+    HourlyStatistic = apps.get_model('website', 'HourlyStatistic')
+    StatisticRollup = apps.get_model('website', 'StatisticRollup')
+
+    until = datetime.now().replace(minute=0, second=0, microsecond=0)
+    weeks, hours = Counter(), Counter()
+
+    for facility, date in Booking.objects.filter(date__lte=until).values_list(
+            'facility', 'date').iterator():
+        weeks[(date.isocalendar()[1], date.year, facility)] += 1
+        hours[(date.date(), date.hour, facility)] += 1
+
+    for (calendar_week, year, facility), bookings in weeks.items():
+        statistic = Statistic.objects.get_or_create(
+            calendar_week=calendar_week, year=year, facility=facility)[0]
+        Statistic.objects.filter(pk=statistic.pk).update(bookings=F('bookings') + bookings)
+
+    for (date, hour, facility), bookings in hours.items():
+        statistic = HourlyStatistic.objects.get_or_create(
+            date=date, hour=hour, facility=facility, defaults={'weekday': date.weekday()})[0]
+        HourlyStatistic.objects.filter(pk=statistic.pk).update(bookings=F('bookings') + bookings)
+
+    StatisticRollup.objects.create(pk=1, until=until, last_booking=Booking.objects.aggregate(
+        last=Max('pk'))['last'] or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0010_hourlystatistic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('until', models.DateTimeField()),
+                ('last_booking', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(roll_up_started_bookings, migrations.RunPython.noop),
+    ]
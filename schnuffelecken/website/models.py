@@ -1,11 +1,51 @@
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, F, Max, Q, Sum
 
+from collections import Counter, defaultdict, namedtuple
 from datetime import datetime, timedelta
+from functools import reduce
+import logging
+import operator
+import uuid
 
 from website.viewmodels import *
 
+logger = logging.getLogger(__name__)
+
+
+# the facilities (lernecken), as in website/urls.py
+FACILITIES = ('g', 'h')
+
+
+def add_counts(model, counts, existing, create):
+    """
+    Add counts of bookings by key to the rows of model: the existing ones
+    (key to pk) with one update per distinct count (and per 500 rows),
+    the missing ones, created by create(*key), with one bulk insert.
+    Must be called inside a transaction.
+    """
+    by_count = defaultdict(list)
+    for key, pk in existing.items():
+        by_count[counts[key]].append(pk)
+
+    for bookings, pks in sorted(by_count.items()):
+        for start in range(0, len(pks), 500):
+            model.objects.filter(pk__in=pks[start:start + 500]).update(
+                bookings=F('bookings') + bookings)
+
+    new = []
+    for key, bookings in counts.items():
+        if key not in existing:
+            row = create(*key)
+            row.bookings = bookings
+            row.clean()
+            new.append(row)
+
+    model.objects.bulk_create(new)
+
 
 class Statistic(models.Model):
     """Simple accumulation of bookings.
@@ -22,17 +62,77 @@ class Statistic(models.Model):
     @staticmethod
     def accumulate(bookings):
         """
-        Accumulate bookings per calender_week, year and facility.
+        Accumulate bookings per calender_week, year and facility as well
+        as per hour (HourlyStatistic). Query sets are counted by the
+        database per facility and slot, which is then summed up.
+        """
+        if isinstance(bookings, models.QuerySet):
+            slots = bookings.values('facility', 'date').annotate(
+                count=Count('id')).values_list('facility', 'date', 'count').order_by()
+        else:
+            slots = [(booking.facility, booking.date, 1) for booking in bookings]
+
+        weeks, hours = Counter(), Counter()
+        for facility, date, count in slots:
+            weeks[(date.isocalendar()[1], date.year, facility)] += count
+            hours[(date.date(), date.hour, facility)] += count
+
+        Statistic.add(weeks)
+        HourlyStatistic.add(hours)
+
+        return sum(weeks.values())
+
+    @staticmethod
+    def roll_up(until=None):
+        """
+        Accumulate the bookings that have started (up to until, at most and
+        by default the current hour) and are not accumulated yet: those after
+        the last roll up and those inserted since, e.g. by the admin. Started
+        bookings cannot be cancelled anymore, so each is counted once.
+        The high-water mark is moved in the same transaction, a concurrent
+        roll up of the same bookings finds it moved and counts nothing.
+        Returns the number of accumulated bookings.
+        """
+        hour = StatisticRollup.current_hour()
+        until = min(until or hour, hour)
+
+        with transaction.atomic():
+            mark = StatisticRollup.objects.get_or_create(
+                pk=1, defaults={'until': StatisticRollup.beginning})[0]
+            last_booking = Booking.objects.aggregate(last=Max('pk'))['last'] or 0
+            until = max(until, mark.until)
+
+            if until == mark.until and last_booking <= mark.last_booking:
+                return 0
+
+            if not StatisticRollup.objects.filter(
+                    pk=1, until=mark.until, last_booking=mark.last_booking).update(
+                    until=until, last_booking=last_booking):
+                return 0
+
+            return Statistic.accumulate(Booking.objects.filter(
+                Q(date__gt=mark.until) | Q(pk__gt=mark.last_booking),
+                date__lte=until, pk__lte=last_booking))
+
+    @staticmethod
+    def add(counts):
+        """
+        Add bookings per (calendar_week, year, facility) with one query to
+        find the existing rows, few updates for them and one bulk insert.
         """
-        for booking in bookings:
-            s, _ = Statistic.objects.get_or_create(
-                calendar_week=booking.calendar_week(),
-                year=booking.date.year,
-                facility=booking.facility)
+        if not counts:
+            return
 
-            s.bookings += 1
+        with transaction.atomic():
+            existing = Statistic.objects.filter(reduce(operator.or_, [
+                Q(calendar_week=calendar_week, year=year, facility=facility)
+                for calendar_week, year, facility in counts]))
 
-            s.save()
+            add_counts(Statistic, counts, {
+                (s.calendar_week, s.year, s.facility): s.pk
+                for s in existing.only('pk', 'calendar_week', 'year', 'facility')},
+                lambda calendar_week, year, facility: Statistic(
+                    calendar_week=calendar_week, year=year, facility=facility))
 
     def clean(self):
         """
@@ -58,6 +158,318 @@ class Statistic(models.Model):
             self.bookings)
 
 
+class HourlyStatistic(models.Model):
+    """
+    Bookings per facility and hour (of a date), accumulated together
+    with Statistic. The weekday (0 is monday) is stored as well, so the
+    utilization heatmap is summed up from the columns of one index.
+    """
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    weekday = models.PositiveSmallIntegerField()
+    facility = models.CharField(max_length=20)
+    bookings = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("date", "hour", "facility")
+        index_together = [("date", "facility", "weekday", "hour", "bookings")]
+
+    @staticmethod
+    def add(counts):
+        """
+        Add bookings per (date, hour, facility). The existing rows are
+        found by the date range of counts and updated per distinct count,
+        the missing ones inserted with one bulk insert.
+        """
+        if not counts:
+            return
+
+        dates = [date for date, _, _ in counts]
+
+        with transaction.atomic():
+            existing = HourlyStatistic.objects.filter(
+                date__range=(min(dates), max(dates)),
+                facility__in={facility for _, _, facility in counts})
+
+            add_counts(HourlyStatistic, counts, {
+                (date, hour, facility): pk for pk, date, hour, facility
+                in existing.values_list('pk', 'date', 'hour', 'facility')
+                if (date, hour, facility) in counts},
+                lambda date, hour, facility: HourlyStatistic(
+                    date=date, hour=hour, weekday=date.weekday(), facility=facility))
+
+    @staticmethod
+    def heatmap(start, end, facility=None):
+        """
+        Return the bookings per (weekday, hour) from start to end
+        (dates, both included) of one or all facilities, summed up
+        by the database.
+        """
+        statistics = HourlyStatistic.objects.filter(date__range=(start, end))
+        if facility:
+            statistics = statistics.filter(facility=facility)
+
+        return {(weekday, hour): bookings for weekday, hour, bookings in statistics.values(
+            'weekday', 'hour').annotate(total=Sum('bookings')).values_list(
+            'weekday', 'hour', 'total').order_by()}
+
+    def clean(self):
+        """
+        Validate facility field
+        """
+        if not self.facility:
+            raise ValidationError(
+                {'facility': 'Facility must contain a value'})
+
+    def save(self, *args, **kwargs):
+        """
+        Override default save method to ALWAYS perform a clean()
+        and derive the weekday from the date.
+        """
+        self.clean()
+        self.weekday = self.date.weekday()
+        return super(HourlyStatistic, self).save(*args, **kwargs)
+
+    def __str__(self):
+        return "[{0} {1:02d}:00][facility:{2}]: {3} bookings".format(
+            self.date, self.hour, self.facility, self.bookings)
+
+
+class StatisticRollup(models.Model):
+    """
+    High-water mark of the statistics (a single row): all bookings up to
+    until and up to the id last_booking are accumulated (see
+    Statistic.roll_up), so removing old bookings does not need to count them.
+    """
+    beginning = datetime(1970, 1, 1)
+
+    until = models.DateTimeField()
+    last_booking = models.PositiveIntegerField(default=0)
+
+    @staticmethod
+    def current_hour():
+        """Return the start of the current hour, the latest possible mark"""
+        return datetime.now().replace(minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def is_behind():
+        """Whether the mark is older than the current hour (one read, no lock)"""
+        return not StatisticRollup.objects.filter(
+            pk=1, until__gte=StatisticRollup.current_hour()).exists()
+
+    def __str__(self):
+        return "Statistics up to {0:%Y-%m-%d %H:%M} (booking {1})".format(
+            self.until, self.last_booking)
+
+
+class FacilityVersion(models.Model):
+    """
+    Change marker of a facility. Every change of its bookings replaces the
+    version with a new random token, which invalidates everything that has
+    been cached for the old one. As the version is written in the same
+    transaction as the bookings, it is consistent across processes.
+    """
+    facility = models.CharField(max_length=20, unique=True)
+    version = models.CharField(max_length=32)
+    modified = models.DateTimeField()
+
+    @staticmethod
+    def get(facility):
+        """
+        Return the current version of a facility
+        ("initial" if its bookings have never been changed).
+        """
+        version = FacilityVersion.objects.filter(
+            facility=facility).values_list('version', flat=True).first()
+
+        return version or "initial"
+
+    @staticmethod
+    def get_marker(facility):
+        """
+        Return version and time of the last change of a facility
+        (None for both if its bookings have never been changed).
+        """
+        marker = FacilityVersion.objects.filter(
+            facility=facility).values_list('version', 'modified').first()
+
+        return marker or (None, None)
+
+    @staticmethod
+    def bump(*facilities):
+        """
+        Mark the bookings of the given facilities as changed.
+        """
+        now = datetime.now()
+
+        for facility in facilities:
+            version = uuid.uuid4().hex
+            changed = FacilityVersion.objects.filter(facility=facility).update(
+                version=version, modified=now)
+
+            if not changed:
+                try:
+                    with transaction.atomic():
+                        FacilityVersion.objects.create(
+                            facility=facility, version=version, modified=now)
+                except IntegrityError:
+                    FacilityVersion.objects.filter(facility=facility).update(
+                        version=version, modified=now)
+
+    def __str__(self):
+        return "[facility:{0}] {1} ({2})".format(
+            self.facility, self.version, self.modified)
+
+
+class QuotaUsage(models.Model):
+    """
+    Number of bookings of a user per week (given by its monday).
+    The counters are changed in the same transaction as the bookings,
+    so the quota can be read from a handful of rows instead of
+    counting the bookings of the user.
+    """
+    user = models.CharField(max_length=20)
+    week = models.DateField()
+    bookings = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "week")
+
+    @staticmethod
+    def week_of(date):
+        """Return the monday of the week of date"""
+        return (date - timedelta(date.weekday())).date()
+
+    @staticmethod
+    def count(bookings):
+        """Count (user, date) pairs per user and week"""
+        return Counter((user, QuotaUsage.week_of(date)) for user, date in bookings)
+
+    @staticmethod
+    def used(username, date=None):
+        """
+        Return the number of bookings of a user from the start
+        of the BookingPeriod of date (default: now) on.
+        """
+        threshold = BookingPeriod(date or datetime.now()).start
+        used = QuotaUsage.objects.filter(
+            user=username, week__gte=threshold.date()).aggregate(used=Sum('bookings'))['used']
+
+        return used or 0
+
+    @staticmethod
+    def add(counts):
+        """Add counts per (user, week) to the counters"""
+        for (user, week), bookings in counts.items():
+            changed = QuotaUsage.objects.filter(user=user, week=week).update(
+                bookings=F('bookings') + bookings)
+
+            if not changed:
+                try:
+                    with transaction.atomic():
+                        QuotaUsage.objects.create(
+                            user=user, week=week, bookings=bookings)
+                except IntegrityError:
+                    QuotaUsage.objects.filter(user=user, week=week).update(
+                        bookings=F('bookings') + bookings)
+
+    @staticmethod
+    def subtract(counts):
+        """
+        Subtract counts per (user, week) from the counters. A counter that
+        is missing or lower than the count has drifted from the bookings:
+        it is left alone and logged (repair with manage.py rebuild_quota_usage).
+        """
+        for (user, week), bookings in counts.items():
+            changed = QuotaUsage.objects.filter(
+                user=user, week=week, bookings__gte=bookings).update(
+                    bookings=F('bookings') - bookings)
+
+            if not changed:
+                logger.warning("quota usage of %s in week of %s is lower than %d bookings",
+                               user, week, bookings)
+
+    @staticmethod
+    def take(username, date):
+        """
+        Count a new booking and enforce the quota. Must be called inside
+        the transaction that inserts the booking: as the insert holds the
+        write lock, concurrent bookings of the same user are serialized.
+        """
+        QuotaUsage.add({(username, QuotaUsage.week_of(date)): 1})
+
+        if QuotaUsage.used(username) > settings.BOOKINGS_QUOTA:
+            raise ValidationError({'quota': 'No more bookings left'})
+
+    @staticmethod
+    def rebuild():
+        """
+        Recreate all counters from the bookings,
+        e.g. after bookings have been changed directly in the database.
+        Returns the number of counters.
+        """
+        counts = QuotaUsage.count(
+            Booking.objects.values_list('user', 'date').iterator())
+
+        with transaction.atomic():
+            QuotaUsage.objects.all().delete()
+            QuotaUsage.objects.bulk_create(
+                QuotaUsage(user=user, week=week, bookings=bookings)
+                for (user, week), bookings in counts.items())
+
+        return len(counts)
+
+    def __str__(self):
+        return "[user:{0}] week of {1}: {2} bookings".format(
+            self.user, self.week, self.bookings)
+
+
+class BookingQuerySet(models.QuerySet):
+    """
+    Query set for bookings that keeps the quota counters up to date
+    and marks the affected facilities as changed on bulk deletes and
+    updates (e.g. from the admin backend).
+    """
+
+    def delete(self):
+        with transaction.atomic():
+            bookings = list(self.values_list('facility', 'user', 'date'))
+            result = super(BookingQuerySet, self).delete()
+
+            QuotaUsage.subtract(QuotaUsage.count(
+                (user, date) for _, user, date in bookings))
+            FacilityVersion.bump(*{facility for facility, _, _ in bookings})
+
+        return result
+
+    def expire(self):
+        """
+        Delete bookings that have taken place, without changing counters
+        or versions (see Booking.remove_old_in_batches): they are neither
+        part of the quota nor of a cached occupancy anymore.
+        """
+        return super(BookingQuerySet, self).delete()
+
+    def update(self, **kwargs):
+        with transaction.atomic():
+            bookings = list(self.values_list('pk', 'facility', 'user', 'date'))
+            facilities = {facility for _, facility, _, _ in bookings}
+            if 'facility' in kwargs:
+                facilities.add(kwargs['facility'])
+
+            result = super(BookingQuerySet, self).update(**kwargs)
+
+            if 'user' in kwargs or 'date' in kwargs:
+                QuotaUsage.subtract(QuotaUsage.count(
+                    (user, date) for _, _, user, date in bookings))
+                QuotaUsage.add(QuotaUsage.count(Booking.objects.filter(
+                    pk__in=[pk for pk, _, _, _ in bookings]).values_list('user', 'date')))
+
+            FacilityVersion.bump(*facilities)
+
+        return result
+
+
 class Booking(models.Model):
     """
     Models a booking. Right now, a booking is very simple - it stores
@@ -68,8 +480,16 @@ class Booking(models.Model):
     facility = models.CharField(max_length=20)
     date = models.DateTimeField()
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         unique_together = ("date", "facility")
+        # (facility, date, user) covers the occupancy grid of a facility,
+        # (user, date) the bookings of a user
+        index_together = [
+            ("facility", "date", "user"),
+            ("user", "date"),
+        ]
 
     def belongs_to(self, user):
         return user and self.user == user.username
@@ -93,40 +513,206 @@ class Booking(models.Model):
         """Check user quota (number of available bookings
         from start of current BookingPeriod on).
         """
-        date = date or datetime.now()
-
-        threshold = BookingPeriod(date).start
+        return settings.BOOKINGS_QUOTA - QuotaUsage.used(username, date)
 
-        bookings = Booking.objects.filter(user=username, date__gte=threshold)
+    @staticmethod
+    def book_many(username, facility, dates, partial=False):
+        """Book several blocks of a user at once, in one transaction.
+        Business hours and quota are checked once for all blocks.
+        Either all blocks are booked or none, unless partial is set:
+        then all valid blocks are booked as far as the quota allows.
+        Returns a dict of date to None if the block has been booked or to
+        the reason why not ("time", "taken", "quota" or "aborted").
+        """
+        results = {}
+        candidates = []
+
+        for date in sorted(set(dates)):
+            booking = Booking(date=date, user=username, facility=facility)
+            try:
+                booking.clean_date()
+            except ValidationError:
+                results[date] = "time"
+                continue
+
+            if booking.lies_in_past():
+                results[date] = "time"
+            else:
+                candidates.append(booking)
+
+        taken = set(Booking.objects.filter(
+            facility=facility, date__in=[booking.date for booking in candidates]
+        ).values_list('date', flat=True))
+
+        for booking in candidates:
+            if booking.date in taken:
+                results[booking.date] = "taken"
+
+        candidates = [booking for booking in candidates if booking.date not in taken]
+        remaining = max(Booking.get_user_quota(username), 0)
+
+        if not partial and (results or len(candidates) > remaining):
+            reason = "quota" if len(candidates) > remaining else "aborted"
+            results.update((booking.date, reason) for booking in candidates)
+            return results
+
+        results.update((booking.date, "quota") for booking in candidates[remaining:])
+        candidates = candidates[:remaining]
+
+        if not candidates:
+            return results
+
+        try:
+            with transaction.atomic():
+                Booking.objects.bulk_create(candidates)
+                QuotaUsage.add(QuotaUsage.count(
+                    (username, booking.date) for booking in candidates))
+
+                if QuotaUsage.used(username) > settings.BOOKINGS_QUOTA:
+                    raise ValidationError({'quota': 'No more bookings left'})
+
+                FacilityVersion.bump(facility)
+
+        except IntegrityError:
+            # another user was faster for (at least) one of the blocks
+            if not partial:
+                results.update((booking.date, "aborted") for booking in candidates)
+                return results
+
+            for booking in candidates:
+                try:
+                    with transaction.atomic():
+                        booking.save()
+                    results[booking.date] = None
+                except IntegrityError:
+                    results[booking.date] = "taken"
+                except ValidationError:
+                    results[booking.date] = "quota"
+
+            return results
+
+        except ValidationError:
+            results.update((booking.date, "quota") for booking in candidates)
+            return results
+
+        results.update((booking.date, None) for booking in candidates)
+        return results
 
-        return settings.BOOKINGS_QUOTA - len(bookings)
+    @staticmethod
+    def expiration_threshold():
+        """Return the date up to which bookings are expired
+        (older than settings.OLD_BOOKINGS_EXPIRATION_IN_DAYS days)
+        """
+        return datetime.now() - timedelta(settings.OLD_BOOKINGS_EXPIRATION_IN_DAYS + 1)
 
     @staticmethod
-    def remove_old():
+    def remove_old(batch_size=None, until=None):
         """Remove all entries older than settings.OLD_BOOKINGS_EXPIRATION_IN_DAYS days
         """
-        threshold = datetime.now() - timedelta(settings.OLD_BOOKINGS_EXPIRATION_IN_DAYS + 1)
-        bookings = Booking.objects.filter(date__lte=threshold)
-        removed_bookings = 0
+        return sum(Booking.remove_old_in_batches(batch_size, until))
 
-        with transaction.atomic():
-            removed_bookings = len(bookings)
-            Statistic.accumulate(bookings)
-            bookings.delete()
+    @staticmethod
+    def remove_old_in_batches(batch_size=None, until=None):
+        """Remove expired bookings (up to until, default: expiration threshold)
+        ordered by date in batches of batch_size (default:
+        settings.OLD_BOOKINGS_BATCH_SIZE) and yield the size of each batch.
+        Every batch is deleted in its own short transaction, so bookings
+        are not blocked for long and an interrupted run can simply be
+        started again. The bookings are in the statistics already (any
+        that are not yet are rolled up first). Only the quota counters of
+        the week of until are decreased per user, those of the weeks
+        before are deleted as a whole at the end.
+        """
+        batch_size = batch_size or settings.OLD_BOOKINGS_BATCH_SIZE
+        until = until or Booking.expiration_threshold()
+        week = QuotaUsage.week_of(until)
+        week_start = datetime.combine(week, datetime.min.time())
+        expired = Booking.objects.filter(date__lte=until).order_by('date')
 
-        return removed_bookings
+        Statistic.roll_up()
+
+        while True:
+            with transaction.atomic():
+                pks = list(expired.values_list('pk', flat=True)[:batch_size])
+
+                if not pks:
+                    break
+
+                batch = Booking.objects.filter(pk__in=pks)
+                QuotaUsage.subtract(QuotaUsage.count(
+                    batch.filter(date__gte=week_start).values_list('user', 'date')))
+                batch.expire()
+
+            yield len(pks)
+
+        QuotaUsage.objects.filter(week__lt=week).delete()
 
     def save(self, *args, **kwargs):
         """
-        Override default save method to ALWAYS perform a clean()
-        to ensure all validation criteria are satisfied.
+        Override default save method to ALWAYS validate the date and
+        enforce the quota atomically with the insert.
         """
-        self.clean()
-        return super(Booking, self).save(*args, **kwargs)
+        self.clean_date()
+
+        with transaction.atomic():
+            facilities = {self.facility}
+            previous = None
+            if self.pk:
+                previous = Booking.objects.filter(pk=self.pk).values_list(
+                    'facility', 'user', 'date').first()
+
+            result = super(Booking, self).save(*args, **kwargs)
+
+            if previous:
+                facility, user, date = previous
+                facilities.add(facility)
+                QuotaUsage.subtract(QuotaUsage.count([(user, date)]))
+                QuotaUsage.add(QuotaUsage.count([(self.user, self.date)]))
+            else:
+                QuotaUsage.take(self.user, self.date)
+
+            FacilityVersion.bump(*facilities)
+
+        return result
+
+    def delete(self, *args, **kwargs):
+        """
+        Override default delete method to release the quota
+        and mark the facility as changed.
+        """
+        with transaction.atomic():
+            result = super(Booking, self).delete(*args, **kwargs)
+            QuotaUsage.subtract(QuotaUsage.count([(self.user, self.date)]))
+            FacilityVersion.bump(self.facility)
+
+        return result
 
     def clean(self):
         """
-        Validate date and quota
+        Validate date and quota. The quota is checked for new bookings and
+        for bookings given to another user or moved to another date (e.g. in
+        the admin backend), not counting the changed booking itself.
+        """
+        self.clean_date()
+
+        previous = None
+        if self.pk:
+            previous = Booking.objects.filter(pk=self.pk).values_list('user', 'date').first()
+
+        if previous == (self.user, self.date):
+            return
+
+        quota = Booking.get_user_quota(self.user)
+        if previous and previous[0] == self.user:
+            # the booking itself is counted already if it is in the quota's range
+            quota += previous[1] >= BookingPeriod(datetime.now()).start
+
+        if quota <= 0:
+            raise ValidationError({'quota': 'No more bookings left'})
+
+    def clean_date(self):
+        """
+        Validate date (full hours within business hours)
         """
         if self.date.minute or self.date.second:
             raise ValidationError(
@@ -134,8 +720,6 @@ class Booking(models.Model):
         if self.date.hour < 8 or self.date.hour > 18:
             raise ValidationError(
                 {'time': 'Time must be within business hours from 8 AM and 6 PM'})
-        if Booking.get_user_quota(self.user) == 0:
-            raise ValidationError({'quota': 'No more bookings left'})
 
     def __str__(self):
         return "{0} ({1})".format(self.user, self.date)
@@ -148,9 +732,12 @@ class BookingPeriod(object):
     the next monday if it is a weekend day).
     """
 
-    def __init__(self, date=None):
+    def __init__(self, date=None, now=None):
         self.num_weeks = 4
-        self.start = self._find_start(date or datetime.now())
+        self.version = None
+        # the only per request input: which blocks are bookable and which day is today
+        self.now = now or datetime.now()
+        self.start = self._find_start(date or self.now)
         self.weeks = self._create_weeks()
 
     def _find_start(self, date=None):
@@ -164,12 +751,98 @@ class BookingPeriod(object):
         return monday.replace(hour=0, minute=0, second=0, microsecond=0)
 
     def _create_weeks(self):
-        return [Week(self.start + timedelta(i * 7)) for i in range(0, self.num_weeks)]
+        return [Week(self.start + timedelta(i * 7), self.now) for i in range(0, self.num_weeks)]
+
+    @property
+    def end(self):
+        return self.start + timedelta(self.num_weeks * 7)
+
+    def load_bookings(self, facility):
+        """Fetch the bookings of all weeks with one date range query
+        (instead of one query per day) and hand them to the days.
+        The slots are shared between all users and cached until the
+        bookings of the facility change, the reserved blocks of a user
+        are derived from the owners in the slots.
+        """
+        self.version = FacilityVersion.get(facility)
+        key = "occupancy:{0}:{1}:{2:%Y%m%d}".format(
+            facility, self.version, self.start)
+        slots = cache.get(key)
+
+        if slots is None:
+            slots = self._fetch_slots(facility)
+            cache.set(key, slots, settings.OCCUPANCY_CACHE_TIMEOUT_IN_SECONDS)
+
+        for week in self.weeks:
+            for day in week.days:
+                day.set_slots(slots.get(day.date.date()) or Day.empty_slots())
+
+    def _fetch_slots(self, facility):
+        query_set = Booking.objects.filter(
+            facility=facility, date__gte=self.start, date__lt=self.end)
+
+        slots = {}
+        for date, owner in query_set.values_list('date', 'user'):
+            slot = Day.slot_of(date)
+            if slot is not None:
+                if date.date() not in slots:
+                    slots[date.date()] = Day.empty_slots()
+                slots[date.date()][slot] = owner
+
+        return slots
 
     def __str__(self):
         return str(self.start)
 
 
+Slot = namedtuple('Slot', ['date', 'timestamp'])
+DaySkeleton = namedtuple('DaySkeleton', ['date', 'name', 'label', 'slots'])
+WeekSkeleton = namedtuple('WeekSkeleton', ['start', 'calendar_week', 'days'])
+
+
+class Calendar(object):
+    """
+    Immutable skeleton of the weeks and days: the date and timestamp of
+    every slot, the day headers and the calendar week. It only depends on
+    the date, so it is computed once and shared by all requests.
+    """
+    day_names = ("Montag", "Dienstag", "Mittwoch", "Donnerstag",
+                 "Freitag", "Samstag", "Sonntag")
+    max_entries = 512
+    _skeletons = {}
+
+    @classmethod
+    def _memoize(cls, key, create):
+        skeleton = cls._skeletons.get(key)
+
+        if skeleton is None:
+            if len(cls._skeletons) >= cls.max_entries:
+                cls._skeletons.clear()
+            skeleton = cls._skeletons[key] = create()
+
+        return skeleton
+
+    @classmethod
+    def day(cls, date):
+        return cls._memoize(('day', date), lambda: cls._create_day(date))
+
+    @classmethod
+    def week(cls, start):
+        return cls._memoize(('week', start), lambda: WeekSkeleton(
+            start, start.isocalendar()[1],
+            tuple(cls.day(start + timedelta(i)) for i in range(0, 5))))
+
+    @classmethod
+    def _create_day(cls, date):
+        slots = []
+        for hour in range(Day.start_hour, Day.end_hour):
+            slot = datetime(date.year, date.month, date.day, hour)
+            slots.append(Slot(slot, slot.timestamp()))
+
+        return DaySkeleton(date, cls.day_names[date.weekday()],
+                           date.strftime("%d.%m.%y"), tuple(slots))
+
+
 class Week(object):
     """
     Represents a week with five days, always starting on a monday.
@@ -177,20 +850,51 @@ class Week(object):
     calendar week.
     """
 
-    def __init__(self, start):
+    def __init__(self, start, now=None):
         self.start = start
-        self.days = [Day(self.start + timedelta(i)) for i in range(0, 5)]
-        self.calendar_week = self.start.isocalendar()[1]
+        self.now = now or datetime.now()
+        self.skeleton = Calendar.week(start)
+        self.days = [Day(day.date, self.now) for day in self.skeleton.days]
+        self.calendar_week = self.skeleton.calendar_week
 
 
 class Day(object):
     """Represents one day and the corresponding bookings
     as either booked, reserved or available.
+    The bookings are kept in a fixed slot index with one entry
+    per bookable hour, holding the username of the owner or None.
     """
+    start_hour = 8
+    end_hour = 19
 
-    def __init__(self, date):
+    def __init__(self, date, now=None):
         self.date = date
-        self.bookings = []
+        self.now = now or datetime.now()
+        self.skeleton = Calendar.day(date)
+        self.slots = None
+        self.bookings = None
+        self._bookings_username = None
+
+    @classmethod
+    def empty_slots(cls):
+        return [None] * (cls.end_hour - cls.start_hour)
+
+    @classmethod
+    def slot_of(cls, date):
+        """Return the slot index of a booking date
+        or None if it lies outside business hours.
+        """
+        if cls.start_hour <= date.hour < cls.end_hour:
+            return date.hour - cls.start_hour
+        return None
+
+    def set_slots(self, slots):
+        """
+        Set the slot index of this day, usually done by
+        BookingPeriod.load_bookings for all days at once.
+        """
+        self.slots = slots
+        self.bookings = None
 
     def get_bookings(self, facility, user):
         """
@@ -198,23 +902,46 @@ class Day(object):
         first call and cache them. If for future usage it should also reflect
         the latest DB state, this needs to be changed
         (probably needs some refactoring then).
+        If the slots have been preloaded, no query is made at all.
         """
-        if not self.bookings:
-            start_time = 8
-            end_time = 19
+        username = getattr(user, 'username', None)
 
-            query_set = Booking.objects.filter(
-                facility=facility, date__date=self.date)
+        if self.bookings is None or self._bookings_username != username:
+            if self.slots is None:
+                self.set_slots(self._fetch_slots(facility))
 
-            for i in range(start_time, end_time):
-                slot = datetime(
-                    self.date.year, self.date.month, self.date.day, i)
-
-                if len(list(filter(lambda b: b.date == slot and b.user == user.username, query_set))) == 1:
-                    self.bookings.append(BlockReserved(slot))
-                elif len(list(filter(lambda b: b.date == slot, query_set))) == 1:
-                    self.bookings.append(BlockBooked(slot))
-                else:
-                    self.bookings.append(BlockAvailable(slot))
+            self.bookings = [self._create_block(i, owner, username)
+                             for i, owner in enumerate(self.slots)]
+            self._bookings_username = username
 
         return self.bookings
+
+    def _fetch_slots(self, facility):
+        start = datetime(self.date.year, self.date.month, self.date.day)
+        query_set = Booking.objects.filter(
+            facility=facility, date__gte=start, date__lt=start + timedelta(1))
+
+        slots = Day.empty_slots()
+        for date, owner in query_set.values_list('date', 'user'):
+            slot = Day.slot_of(date)
+            if slot is not None:
+                slots[slot] = owner
+
+        return slots
+
+    def _create_block(self, slot, owner, username):
+        date, timestamp = self.skeleton.slots[slot]
+
+        return Day.create_block(date, owner, username, timestamp, self.now)
+
+    @staticmethod
+    def create_block(date, owner, username, timestamp=None, now=None):
+        """
+        Create the block of a slot as seen by the given user
+        """
+        if owner is None:
+            return BlockAvailable(date, timestamp, now)
+        elif owner == username:
+            return BlockReserved(date, timestamp, now)
+        else:
+            return BlockBooked(date, timestamp, now)
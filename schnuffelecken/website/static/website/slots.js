@@ -0,0 +1,36 @@
+// keep the booking tables up to date through server-sent events
+var slots = (function() {
+
+	function update(block) {
+		var tds = document.querySelectorAll('td[data-timestamp="' + block.timestamp + '"]');
+
+		for(var i = 0; i < tds.length; i++) {
+			var td = tds[i];
+
+			// the first class is the label of the block
+			td.className = td.className.replace(/^\S+/, block.label);
+			td.setAttribute("data-available", block.available);
+			td.textContent = block.text;
+		}
+	}
+
+	function subscribe(url, version) {
+		if(!window.EventSource) {
+			return false;
+		}
+
+		var source = new EventSource(url + "?version=" + encodeURIComponent(version));
+
+		source.addEventListener("slots", function(event) {
+			JSON.parse(event.data).forEach(update);
+		});
+
+		return true;
+	}
+
+	return {
+		"update": update,
+		"subscribe": subscribe
+	}
+
+}());
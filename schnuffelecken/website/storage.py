@@ -0,0 +1,78 @@
+import gzip
+import io
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, StaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+"""
+Static files under content-hashed names (style.55e7cbb9ba48.css) with
+precompressed variants next to them (style.55e7cbb9ba48.css.gz/.br), so
+the web server can send them with far-future cache headers and without
+compressing them on every request (see conf/lernecken-ssl.conf).
+"""
+
+# only text formats benefit from compression, images and woff fonts are compressed already
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.eot', '.ttf', '.txt', '.html', '.json')
+
+# a variant is kept only if it is smaller than this share of the original
+MINIMUM_SAVING = 0.95
+
+
+def compress(content):
+    """Return the gzip and (if the brotli module is installed) brotli variants of content"""
+    buffer = io.BytesIO()
+    with gzip.GzipFile(filename='', mode='wb', compresslevel=9, fileobj=buffer, mtime=0) as archive:
+        archive.write(content)
+    variants = {'gz': buffer.getvalue()}
+
+    if brotli is not None:
+        variants['br'] = brotli.compress(content)
+
+    return {encoding: data for encoding, data in variants.items()
+            if len(data) < len(content) * MINIMUM_SAVING}
+
+
+def is_compressible(name):
+    return os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes the compressed variants
+    of the hashed files. Until collectstatic wrote a manifest (development,
+    tests) the files are referenced under their plain names.
+    """
+
+    def url(self, name, force=False):
+        if not self.hashed_files and not force:
+            return StaticFilesStorage.url(self, name)
+
+        return super(CompressedManifestStaticFilesStorage, self).url(name, force)
+
+    def post_process(self, paths, dry_run=False, **options):
+        for result in super(CompressedManifestStaticFilesStorage, self).post_process(
+                paths, dry_run, **options):
+            yield result
+
+        if dry_run:
+            return
+
+        for name in sorted(set(self.hashed_files.values())):
+            if not is_compressible(name):
+                continue
+
+            with self.open(name) as original:
+                variants = compress(original.read())
+
+            for encoding, data in sorted(variants.items()):
+                compressed_name = "{0}.{1}".format(name, encoding)
+                if self.exists(compressed_name):
+                    self.delete(compressed_name)
+                self._save(compressed_name, ContentFile(data))
+                yield name, compressed_name, True
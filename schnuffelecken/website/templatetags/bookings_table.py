@@ -1,13 +1,15 @@
 from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from website.viewmodels import BlockBooked
 
 register = template.Library()
 
 
-@register.inclusion_tag('table.html')
-def bookings_table(week, which):
-    """Reusable component that renders the booking table which is used
-    in several places.
-    """
+def table_context(week, which):
     anchor, prev_week, next_week = None, None, None
 
     if which:
@@ -20,3 +22,49 @@ def bookings_table(week, which):
             'prev': prev_week,
             'next': next_week,
             'current': which}
+
+
+def render_cell(block):
+    return get_template('table_cell.html').render({'block': block})
+
+
+def fragment_key(week, which):
+    """
+    Key of the rendered table: it changes with every booking (version)
+    and every hour, when blocks become unbookable.
+    """
+    if not getattr(week, 'version', None):
+        return None
+
+    return "table:{0}:{1}:{2:%Y%m%d}:{3}:{4:%Y%m%d%H}".format(
+        week.facility, week.version, week.first_day, which, week.created)
+
+
+@register.simple_tag
+def bookings_table(week, which):
+    """Reusable component that renders the booking table which is used
+    in several places.
+    The table is the same for all users except for their reserved blocks,
+    so it is cached with these shown as booked and only they are replaced
+    per user.
+    """
+    key = fragment_key(week, which)
+    reserved = [(render_cell(block),
+                 render_cell(BlockBooked(block.date, block.timestamp, week.created)))
+                for row in week.rows for block in row.blocks if block.label == "reserved"]
+    shared = cache.get(key) if key else None
+
+    if shared is None:
+        html = get_template('table.html').render(table_context(week, which))
+
+        if key:
+            shared = html
+            for own, booked in reserved:
+                shared = shared.replace(own, booked)
+            cache.set(key, shared, settings.OCCUPANCY_CACHE_TIMEOUT_IN_SECONDS)
+    else:
+        html = shared
+        for own, booked in reserved:
+            html = html.replace(booked, own)
+
+    return mark_safe(html)
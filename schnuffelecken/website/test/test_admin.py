@@ -0,0 +1,86 @@
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+
+from datetime import datetime, timedelta
+
+from website.admin import CappedCountPaginator
+from website.models import Booking, QuotaUsage
+
+setup_test_environment()
+
+
+class AdminTests(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        User.objects.create_superuser("chef", "chef@example.com", "secret")
+        self.client.login(username="chef", password="secret")
+
+        self.day = (datetime.now() + timedelta(2)).replace(hour=10, minute=0, second=0, microsecond=0)
+        for hour in range(0, 3):
+            Booking(date=self.day + timedelta(hours=hour), user="max", facility='g').save()
+        Booking(date=self.day, user="eva", facility='h').save()
+        Booking(date=self.day + timedelta(1), user="eva", facility='g').save()
+
+    def test_changelist_searches_exact_user(self):
+        response = self.client.get('/admin/website/booking/', {"q": "eva"})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+        response = self.client.get('/admin/website/booking/', {"q": "ev"})
+
+        self.assertEqual(response.context["cl"].result_count, 0)
+
+    def test_changelist_filters_facility(self):
+        response = self.client.get('/admin/website/booking/', {"facility": "h"})
+
+        self.assertEqual(response.context["cl"].result_count, 1)
+        self.assertIsNone(response.context["cl"].full_result_count)
+
+    def test_statistics_changelists(self):
+        self.assertEqual(200, self.client.get('/admin/website/statistic/').status_code)
+        self.assertEqual(200, self.client.get('/admin/website/hourlystatistic/').status_code)
+
+    def test_paginator_counts_up_to_limit(self):
+        paginator = CappedCountPaginator(Booking.objects.all(), 2)
+        paginator.limit = 4
+
+        self.assertEqual(paginator.count, 4)
+        self.assertEqual(paginator.num_pages, 2)
+
+    def test_cancel_bookings_keeps_started_ones(self):
+        yesterday = datetime.now() - timedelta(1)
+        started = Booking(date=yesterday.replace(hour=10, minute=0, second=0, microsecond=0),
+                          user="max", facility='h')
+        started.save()
+        selected = [started.pk] + list(Booking.objects.filter(user="eva").values_list('pk', flat=True))
+
+        self.client.post('/admin/website/booking/', {
+            "action": "cancel_bookings", ACTION_CHECKBOX_NAME: selected})
+
+        self.assertEqual(list(Booking.objects.filter(pk__in=selected)), [started])
+
+    def test_cancel_days(self):
+        """
+        All bookings of the facility on the day of the selected
+        booking are cancelled, with a single delete
+        """
+        selected = Booking.objects.get(facility='g', date=self.day)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/admin/website/booking/', {
+                "action": "cancel_days", ACTION_CHECKBOX_NAME: [selected.pk]})
+        deletes = [query for query in queries.captured_queries
+                   if query["sql"].startswith('DELETE FROM "website_booking"')]
+
+        self.assertEqual(302, response.status_code)
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(sorted(Booking.objects.values_list('user', 'facility')),
+                         [('eva', 'g'), ('eva', 'h')])
+        self.assertEqual(QuotaUsage.objects.filter(user="max").aggregate(
+            bookings=Sum('bookings'))['bookings'] or 0, 0)
@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from datetime import datetime, timedelta
+
+from website.models import *
+from website.viewmodels import *
+
+setup_test_environment()
+
+
+class SlotsApiTests(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+
+        self.user = User.objects.get_or_create(
+            username='max', first_name="Max", last_name="Mustermann")[0]
+
+        self.client.force_login(self.user)
+        self.url = reverse('api_slots', kwargs={'facility': 'g'})
+
+        self.first_day = BookingPeriod().weeks[0].start
+        self.next_week = self.first_day + timedelta(7)
+
+    def test_get_occupancy_of_all_weeks(self):
+        Booking(date=self.next_week.replace(hour=8),
+                user=self.user.username, facility='g').save()
+        Booking(date=self.next_week.replace(hour=10),
+                user='peter', facility='g').save()
+
+        response = self.client.get(self.url)
+        data = response.json()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(8, data["first_hour"])
+        self.assertEqual(4, len(data["weeks"]))
+        self.assertEqual("rabaaaaaaaa", data["weeks"][1]["days"][0]["slots"])
+        self.assertEqual(self.next_week.strftime("%Y-%m-%d"),
+                         data["weeks"][1]["days"][0]["date"])
+
+    def test_get_occupancy_of_week_range(self):
+        response = self.client.get(self.url, {"from": 2, "to": 3})
+        weeks = response.json()["weeks"]
+
+        self.assertEqual(2, len(weeks))
+        self.assertEqual(BookingPeriod().weeks[1].calendar_week,
+                         weeks[0]["calendar_week"])
+
+    def test_reject_invalid_week_range(self):
+        self.assertEqual(400, self.client.get(
+            self.url, {"from": 0}).status_code)
+        self.assertEqual(400, self.client.get(
+            self.url, {"from": 3, "to": 2}).status_code)
+        self.assertEqual(400, self.client.get(
+            self.url, {"to": "x"}).status_code)
+
+    def test_book_returns_only_changed_slot(self):
+        date = datetime(2030, 3, 1, 11)
+
+        response = self.client.post(self.url, {"book": str(date.timestamp())})
+        data = response.json()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(str(date.timestamp()), data["slot"]["timestamp"])
+        self.assertEqual("reserved", data["slot"]["available"])
+        self.assertEqual(settings.BOOKINGS_QUOTA - 1, data["quota"])
+        self.assertEqual(BookingSuccessfulAlert(date).message,
+                         data["alert"]["message"])
+
+    def test_book_booked_slot_is_not_allowed(self):
+        date = datetime(2030, 3, 1, 11)
+        Booking(date=date, user='peter', facility='g').save()
+
+        response = self.client.post(self.url, {"book": str(date.timestamp())})
+        data = response.json()
+
+        self.assertEqual(403, response.status_code)
+        self.assertEqual("booked", data["slot"]["available"])
+        self.assertEqual(NotAllowedAlert().message, data["alert"]["message"])
+
+    def test_cancel_returns_available_slot(self):
+        date = datetime(2030, 3, 1, 11)
+        Booking(date=date, user=self.user.username, facility='g').save()
+
+        response = self.client.post(
+            self.url, {"cancel": str(date.timestamp())})
+        data = response.json()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("available", data["slot"]["available"])
+        self.assertEqual(settings.BOOKINGS_QUOTA, data["quota"])
+        self.assertEqual(CancellationAlert(date).message,
+                         data["alert"]["message"])
+
+    def test_reject_invalid_actions(self):
+        self.assertEqual(400, self.client.post(self.url, {}).status_code)
+        self.assertEqual(400, self.client.post(
+            self.url, {"book": "tomorrow"}).status_code)
+
+    def test_changes_require_login(self):
+        self.client.logout()
+
+        response = self.client.post(
+            self.url, {"book": str(datetime(2030, 3, 1, 11).timestamp())})
+
+        self.assertEqual(403, response.status_code)
+        self.assertEqual(0, Booking.objects.count())
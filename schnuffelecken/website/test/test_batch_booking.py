@@ -0,0 +1,142 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.urls import reverse
+
+from datetime import datetime, timedelta
+
+from website.models import *
+from website.viewmodels import *
+
+setup_test_environment()
+
+
+class BatchBookingTests(TestCase):
+
+    def setUp(self):
+        self.afternoon = [datetime(2030, 3, 11, hour) for hour in range(13, 17)]
+
+    def test_book_all_blocks(self):
+        results = Booking.book_many("max", 'g', self.afternoon)
+
+        self.assertEqual(results, {date: None for date in self.afternoon})
+        self.assertEqual(Booking.objects.filter(user="max").count(), 4)
+        self.assertEqual(Booking.get_user_quota("max"),
+                         settings.BOOKINGS_QUOTA - 4)
+
+    def test_book_nothing_if_one_block_is_taken(self):
+        Booking(date=self.afternoon[1], user="ute", facility='g').save()
+
+        results = Booking.book_many("max", 'g', self.afternoon)
+
+        self.assertEqual(results[self.afternoon[0]], "aborted")
+        self.assertEqual(results[self.afternoon[1]], "taken")
+        self.assertEqual(Booking.objects.filter(user="max").count(), 0)
+        self.assertEqual(Booking.get_user_quota("max"),
+                         settings.BOOKINGS_QUOTA)
+
+    def test_book_nothing_if_quota_is_exceeded(self):
+        dates = [datetime(2030, 3, 11 + day, hour)
+                 for day in range(0, 2) for hour in range(8, 14)]
+
+        results = Booking.book_many("max", 'g', dates)
+
+        self.assertEqual(set(results.values()), {"quota"})
+        self.assertEqual(Booking.objects.count(), 0)
+
+    def test_partial_booking_books_valid_blocks_within_quota(self):
+        Booking(date=self.afternoon[1], user="ute", facility='g').save()
+        dates = self.afternoon + [datetime(2030, 3, 11, 7)] + \
+            [datetime(2030, 3, 12, hour) for hour in range(8, 16)]
+
+        results = Booking.book_many("max", 'g', dates, partial=True)
+
+        self.assertEqual(results[self.afternoon[0]], None)
+        self.assertEqual(results[self.afternoon[1]], "taken")
+        self.assertEqual(results[datetime(2030, 3, 11, 7)], "time")
+        self.assertEqual(results[datetime(2030, 3, 12, 15)], "quota")
+        self.assertEqual(Booking.objects.filter(user="max").count(),
+                         settings.BOOKINGS_QUOTA)
+        self.assertEqual(Booking.get_user_quota("max"), 0)
+
+    def test_do_not_book_past_blocks(self):
+        past = datetime.now().replace(
+            hour=8, minute=0, second=0, microsecond=0) - timedelta(1)
+
+        results = Booking.book_many("max", 'g', [past], partial=True)
+
+        self.assertEqual(results, {past: "time"})
+
+    def test_batch_booking_uses_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            Booking.book_many("max", 'g', self.afternoon)
+
+        inserts = [query for query in queries.captured_queries
+                   if query['sql'].startswith('INSERT INTO "website_booking"')]
+
+        self.assertEqual(len(inserts), 1)
+
+
+class BatchBookingViewTests(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.get_or_create(
+            username='max', first_name="Max", last_name="Mustermann")[0]
+        self.client.force_login(self.user)
+
+        self.dates = [datetime(2030, 3, 11, hour) for hour in range(13, 16)]
+        self.timestamps = [str(date.timestamp()) for date in self.dates]
+
+    def test_bookings_page_books_several_blocks(self):
+        response = self.client.post(
+            reverse('bookings', kwargs={'facility': 'g'}), {'book': self.timestamps})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(type(response.context["info"]), BatchBookingAlert)
+        self.assertEqual(response.context["quota"],
+                         settings.BOOKINGS_QUOTA - 3)
+
+    def test_bookings_page_reports_every_block(self):
+        """
+        If one block is taken, the page shows it and that the others were not booked
+        """
+        Booking(date=self.dates[1], user="ute", facility='g').save()
+
+        response = self.client.post(
+            reverse('bookings', kwargs={'facility': 'g'}), {'book': self.timestamps})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.context["info"].message, NotAllowedAlert(self.dates[1]).message)
+        self.assertEqual([type(alert) for alert in response.context["alerts"]],
+                         [BookingAbortedAlert, NotAllowedAlert, BookingAbortedAlert])
+        self.assertContains(response, BookingAbortedAlert(self.dates[2]).message, status_code=403)
+
+    def test_api_reports_every_block(self):
+        Booking(date=self.dates[1], user="ute", facility='g').save()
+
+        response = self.client.post(
+            reverse('api_slots', kwargs={'facility': 'g'}),
+            {'book': self.timestamps, 'partial': '1'})
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([slot["available"] for slot in data["slots"]],
+                         ["reserved", "booked", "reserved"])
+        self.assertEqual([result["message"] for result in data["results"]],
+                         [BookingSuccessfulAlert(self.dates[0]).message,
+                          NotAllowedAlert(self.dates[1]).message,
+                          BookingSuccessfulAlert(self.dates[2]).message])
+        self.assertEqual(data["alert"]["message"], BatchBookingAlert(2).message)
+        self.assertEqual(data["quota"], settings.BOOKINGS_QUOTA - 2)
+
+    def test_api_all_or_nothing_fails_as_a_whole(self):
+        Booking(date=self.dates[1], user="ute", facility='g').save()
+
+        response = self.client.post(
+            reverse('api_slots', kwargs={'facility': 'g'}), {'book': self.timestamps})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()["quota"], settings.BOOKINGS_QUOTA)
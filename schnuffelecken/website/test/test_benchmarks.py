@@ -0,0 +1,48 @@
+from django.test import TestCase
+from django.test.utils import setup_test_environment
+
+from website.benchmarks import booking_engine
+from website.models import *
+
+setup_test_environment()
+
+
+class BookingEngineBenchmarkTests(TestCase):
+
+    def test_seed(self):
+        """
+        Seeding creates the requested number of bookings, partly expired
+        """
+        booking_engine.seed(bookings=300, users=20, facilities='gh')
+
+        self.assertEqual(Booking.objects.count(), 300)
+        self.assertTrue(Booking.objects.filter(
+            date__lte=Booking.expiration_threshold()).exists())
+        self.assertEqual(QuotaUsage.objects.aggregate(total=Sum('bookings'))['total'], 300)
+
+    def test_run(self):
+        """
+        All hot paths are timed and leave the seeded data untouched
+        """
+        booking_engine.seed(bookings=200, users=20)
+        results = booking_engine.run(repeat=2)
+
+        self.assertIn('remove_old', results)
+        self.assertIn('bookings_view', results)
+        self.assertGreater(results['bookings_view']['queries'], 0)
+        self.assertEqual(Booking.objects.count(), 200)
+
+    def test_compare(self):
+        """
+        Slower medians and additional queries are regressions
+        """
+        baseline = {"a": {"median_ms": 10.0, "queries": 2},
+                    "b": {"median_ms": 10.0, "queries": 2}}
+        results = {"a": {"median_ms": 11.0, "queries": 2},
+                   "b": {"median_ms": 13.0, "queries": 3},
+                   "c": {"median_ms": 99.0, "queries": 9}}
+
+        regressions = booking_engine.compare(results, baseline, threshold=0.2)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(regression.startswith("b:") for regression in regressions))
@@ -104,6 +104,31 @@ class BookingModelTests(TestCase):
         self.assertEqual(5, Statistic.objects.get(
             calendar_week=5, year=2014, facility='h').bookings)
 
+    def test_remove_old_does_not_count_rolled_up_bookings_again(self):
+        monday = datetime(2014, 1, 27, 8)
+        Booking(date=monday, user="max", facility='h').save()
+
+        Statistic.roll_up()
+        Booking.remove_old()
+
+        self.assertEqual(1, Statistic.objects.get(
+            calendar_week=5, year=2014, facility='h').bookings)
+
+    def test_remove_old_keeps_quota_counters_consistent(self):
+        """
+        The counters of expired weeks are deleted, those of the week
+        of the threshold decreased by the removed bookings
+        """
+        until = datetime(2014, 1, 29, 12)
+        Booking(date=datetime(2014, 1, 20, 8), user="max", facility='h').save()
+        Booking(date=datetime(2014, 1, 27, 8), user="max", facility='h').save()
+        Booking(date=datetime(2014, 1, 30, 8), user="max", facility='h').save()
+
+        self.assertEqual(2, Booking.remove_old(until=until))
+
+        self.assertFalse(QuotaUsage.objects.filter(week=datetime(2014, 1, 20).date()).exists())
+        self.assertEqual(1, QuotaUsage.objects.get(week=datetime(2014, 1, 27).date()).bookings)
+
     def test_do_not_allow_empty_user_name_on_clean(self):
         booking = Booking(date=datetime(2017, 1, 3, 12))
         with self.assertRaises(ValidationError):
@@ -172,6 +197,26 @@ class BookingModelTests(TestCase):
             Booking(date=date + timedelta(days=1),
                     user=user, facility='g').save()
 
+    def test_clean_checks_quota_of_new_user(self):
+        """
+        Giving a booking to another user (e.g. in the admin backend)
+        counts against the quota of the new user
+        """
+        date = datetime(2030, 3, 22, 8)
+        for hour in range(0, settings.BOOKINGS_QUOTA):
+            Booking(date=date + timedelta(hours=hour), user="max", facility='g').save()
+        booking = Booking(date=date, user="eva", facility='h')
+        booking.save()
+
+        booking.user = "max"
+        with self.assertRaises(ValidationError):
+            booking.clean()
+
+        # moving a booking of a user with no quota left is fine
+        moved = Booking.objects.get(date=date, facility='g')
+        moved.date = date + timedelta(days=1)
+        moved.clean()
+
     def test_bookings_in_same_week_affect_quota(self):
         """
         Bookings in same week shold affect user quota, regardless which day of the week we have
@@ -282,3 +327,81 @@ class BookingModelTests(TestCase):
         self.assertTrue(current.lies_in_past())
         self.assertTrue(past.lies_in_past())
         self.assertFalse(future.lies_in_past())
+
+    def test_quota_is_read_from_counters(self):
+        """
+        Reading the quota should not count the bookings of the user
+        """
+        date = datetime(2030, 3, 22, 8)
+
+        Booking(date=date, user="max", facility='g').save()
+        Booking(date=date + timedelta(7), user="max", facility='h').save()
+
+        with self.assertNumQueries(1):
+            quota = Booking.get_user_quota("max")
+
+        self.assertEqual(quota, settings.BOOKINGS_QUOTA - 2)
+        self.assertEqual(QuotaUsage.objects.get(
+            user="max", week=datetime(2030, 3, 18).date()).bookings, 1)
+
+    def test_cancellation_releases_quota(self):
+        date = datetime(2030, 3, 22, 8)
+
+        Booking(date=date, user="max", facility='g').save()
+        Booking(date=date + timedelta(hours=1), user="max", facility='g').save()
+
+        Booking.objects.get(date=date).delete()
+        self.assertEqual(Booking.get_user_quota("max"),
+                         settings.BOOKINGS_QUOTA - 1)
+
+        Booking.objects.filter(user="max").delete()
+        self.assertEqual(Booking.get_user_quota("max"),
+                         settings.BOOKINGS_QUOTA)
+
+    def test_subtract_logs_drifted_counter(self):
+        """
+        A counter lower than the bookings to subtract is left alone and logged
+        """
+        date = datetime(2030, 3, 22, 8)
+        Booking(date=date, user="max", facility='g').save()
+        QuotaUsage.objects.filter(user="max").update(bookings=0)
+
+        with self.assertLogs('website.models', 'WARNING'):
+            Booking.objects.get(date=date).delete()
+
+        self.assertEqual(QuotaUsage.objects.get(user="max").bookings, 0)
+
+    def test_rejected_booking_does_not_use_quota(self):
+        date = datetime(2030, 3, 22, 8)
+
+        Booking(date=date, user="max", facility='g').save()
+
+        with self.assertRaises(IntegrityError):
+            Booking(date=date, user="stefanie", facility='g').save()
+
+        self.assertEqual(Booking.get_user_quota("stefanie"),
+                         settings.BOOKINGS_QUOTA)
+
+    def test_moving_booking_to_other_user_moves_quota(self):
+        date = datetime(2030, 3, 22, 8)
+
+        booking = Booking(date=date, user="max", facility='g')
+        booking.save()
+        booking.user = "stefanie"
+        booking.save()
+
+        self.assertEqual(Booking.get_user_quota("max"),
+                         settings.BOOKINGS_QUOTA)
+        self.assertEqual(Booking.get_user_quota("stefanie"),
+                         settings.BOOKINGS_QUOTA - 1)
+
+    def test_rebuild_quota_counters(self):
+        date = datetime(2030, 3, 22, 8)
+
+        Booking(date=date, user="max", facility='g').save()
+        Booking(date=date + timedelta(7), user="max", facility='g').save()
+        QuotaUsage.objects.all().update(bookings=7)
+
+        self.assertEqual(QuotaUsage.rebuild(), 2)
+        self.assertEqual(Booking.get_user_quota("max"),
+                         settings.BOOKINGS_QUOTA - 2)
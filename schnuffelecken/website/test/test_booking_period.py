@@ -135,4 +135,95 @@ class BookingPeriodTests(TestCase):
         self.assertEqual(type(bookings[7]), BlockReserved)  # by max
         self.assertEqual(type(bookings[8]), BlockAvailable)
         self.assertEqual(type(bookings[9]), BlockAvailable)
-        self.assertEqual(type(bookings[10]), BlockAvailable)
\ No newline at end of file
+        self.assertEqual(type(bookings[10]), BlockAvailable)
+
+    def test_period_loads_all_bookings_with_one_query(self):
+        """
+        A BookingPeriod should fetch the bookings of all four weeks at once,
+        so the days do not query the database themselves
+        (the other query reads the facility version for the cache).
+        """
+        monday = datetime(2017, 3, 27)
+
+        Booking(date=datetime(2017, 3, 27, 8),
+                user=self.user.username, facility='g').save()
+        Booking(date=datetime(2017, 4, 5, 12), user='ute', facility='g').save()
+        Booking(date=datetime(2017, 4, 21, 18), user='jon', facility='g').save()
+        Booking(date=datetime(2017, 4, 24, 8), user='jon', facility='g').save()
+        Booking(date=datetime(2017, 3, 28, 9), user='jon', facility='h').save()
+
+        booking_period = BookingPeriod(monday)
+
+        with self.assertNumQueries(2):
+            booking_period.load_bookings('g')
+            blocks = [day.get_bookings('g', self.user)
+                      for week in booking_period.weeks for day in week.days]
+
+        self.assertEqual(type(blocks[0][0]), BlockReserved)
+        self.assertEqual(type(blocks[1][1]), BlockAvailable)  # facility h
+        self.assertEqual(type(blocks[7][4]), BlockBooked)  # by ute
+        self.assertEqual(type(blocks[19][10]), BlockBooked)  # by jon
+
+        booked = [block for day in blocks for block in day
+                  if type(block) != BlockAvailable]
+
+        self.assertEqual(len(booked), 3)
+
+    def test_day_without_bookings_is_fetched_only_once(self):
+        """
+        An empty day should be cached like any other day and not be
+        queried again on subsequent calls.
+        """
+        day = Day(datetime(2017, 3, 27))
+
+        with self.assertNumQueries(1):
+            first = day.get_bookings('g', self.user)
+            second = day.get_bookings('g', self.user)
+
+        self.assertIs(first, second)
+        self.assertEqual(day.slots, [None] * 11)
+
+    def test_day_slots_hold_the_owner_of_each_hour(self):
+        """
+        The slot index of a day maps each bookable hour to the booking owner
+        """
+        Booking(date=datetime(2017, 3, 27, 8), user='ute', facility='g').save()
+        Booking(date=datetime(2017, 3, 27, 18), user='jon', facility='g').save()
+
+        day = Day(datetime(2017, 3, 27))
+        bookings = day.get_bookings('g', self.user)
+
+        self.assertEqual(day.slots[0], 'ute')
+        self.assertEqual(day.slots[10], 'jon')
+        self.assertEqual(day.slots[1:10], [None] * 9)
+        self.assertEqual(bookings[10].date, datetime(2017, 3, 27, 18))
+
+    def test_calendar_is_shared_between_periods(self):
+        """
+        Dates, timestamps and headers are computed once per week and day
+        """
+        first = BookingPeriod(datetime(2030, 3, 13, 9))
+        second = BookingPeriod(datetime(2030, 3, 13, 17))
+
+        self.assertIs(first.weeks[0].skeleton, second.weeks[0].skeleton)
+        self.assertIs(first.weeks[0].days[2].skeleton, Calendar.day(datetime(2030, 3, 13)))
+
+        slot = Calendar.day(datetime(2030, 3, 13)).slots[2]
+        self.assertEqual(slot.date, datetime(2030, 3, 13, 10))
+        self.assertEqual(slot.timestamp, datetime(2030, 3, 13, 10).timestamp())
+        self.assertEqual(Calendar.week(datetime(2030, 3, 11)).calendar_week, 11)
+
+    def test_one_now_per_period(self):
+        """
+        A single "now" decides which blocks are bookable and which day is today
+        """
+        now = datetime(2030, 3, 13, 10, 30)
+        booking_period = BookingPeriod(now, now=now)
+        days = booking_period.weeks[0].days
+        week = WeekViewModel(booking_period.weeks[0], 'g', self.user)
+
+        self.assertEqual([block.bookable for block in days[2].get_bookings('g', self.user)],
+                         [False] * 3 + [True] * 8)
+        self.assertFalse(any(block.bookable for block in days[1].get_bookings('g', self.user)))
+        self.assertEqual([header[2] for header in week.headers], [False, False, True, False, False])
+        self.assertEqual(week.headers[2][:2], ("Mittwoch", "13.03.30"))
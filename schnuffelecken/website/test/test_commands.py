@@ -1,9 +1,11 @@
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
 from django.test import TestCase
 from django.utils.six import StringIO
 
 from datetime import datetime, timedelta
-from website.models import Booking
+from website.models import Booking, QuotaUsage, Statistic
 
 
 class CommandsTests(TestCase):
@@ -59,3 +61,74 @@ class CommandsTests(TestCase):
 
         self.assertIn("Removed 3 bookings", result)
         self.assertEqual(len(Booking.objects.all()), 3)
+
+    def test_rebuild_quota_usage(self):
+        """
+        Rebuild quota counters from the bookings
+        """
+        Booking(date=self.today, user="max", facility='h').save()
+        QuotaUsage.objects.all().delete()
+
+        out = StringIO()
+
+        call_command('rebuild_quota_usage', stdout=out)
+
+        self.assertIn("Rebuilt 1 quota counters", out.getvalue())
+        self.assertEqual(QuotaUsage.objects.get(user="max").bookings, 1)
+
+    def create_old_bookings(self):
+        for days in range(31, 36):
+            Booking(date=self.today - timedelta(days), user="karl", facility='h').save()
+
+    def test_remove_old_bookings_in_batches(self):
+        """
+        Remove old bookings in batches of the given size
+        """
+        self.create_old_bookings()
+        out = StringIO()
+
+        call_command('remove_old_bookings', batch_size=2, stdout=out)
+
+        result = out.getvalue()
+
+        self.assertEqual(result.count("Removed batch of"), 3)
+        self.assertIn("Removed 5 bookings", result)
+        self.assertEqual(Booking.objects.count(), 0)
+
+    def test_remove_old_bookings_dry_run(self):
+        self.create_old_bookings()
+        out = StringIO()
+
+        call_command('remove_old_bookings', dry_run=True, stdout=out)
+
+        self.assertIn("Would remove 5 bookings", out.getvalue())
+        self.assertEqual(Booking.objects.count(), 5)
+
+    def test_remove_old_bookings_until(self):
+        """
+        Only remove bookings up to the given date
+        """
+        self.create_old_bookings()
+        until = (self.today - timedelta(33)).strftime("%Y-%m-%dT%H:%M")
+
+        call_command('remove_old_bookings', '--until', until, stdout=StringIO())
+
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_remove_old_bookings_not_before_expiration(self):
+        until = self.today.strftime("%Y-%m-%d")
+
+        with self.assertRaises(CommandError):
+            call_command('remove_old_bookings', '--until', until, stdout=StringIO())
+
+    def test_rollup_statistics(self):
+        """
+        Accumulate the bookings that have started into the statistics
+        """
+        self.create_old_bookings()
+        out = StringIO()
+
+        call_command('rollup_statistics', stdout=out)
+
+        self.assertIn("Accumulated 5 bookings", out.getvalue())
+        self.assertEqual(Statistic.objects.aggregate(total=Sum('bookings'))['total'], 5)
@@ -0,0 +1,52 @@
+import sqlite3
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from website.benchmarks import sqlite_concurrency
+from website.db import apply_pragmas, configure_connection
+
+
+class SqlitePragmaTests(TestCase):
+
+    def test_apply_pragmas(self):
+        """
+        Pragmas are executed on the given cursor
+        """
+        cursor = sqlite3.connect(":memory:").cursor()
+        apply_pragmas(cursor, {'busy_timeout': 1234, 'synchronous': 'NORMAL'})
+
+        self.assertEqual(cursor.execute("PRAGMA busy_timeout").fetchone()[0], 1234)
+        self.assertEqual(cursor.execute("PRAGMA synchronous").fetchone()[0], 1)
+
+    def test_reject_unsupported_pragmas(self):
+        """
+        Only known pragma names with plain values are accepted
+        """
+        cursor = sqlite3.connect(":memory:").cursor()
+
+        with self.assertRaises(ValueError):
+            apply_pragmas(cursor, {'writable_schema': 1})
+        with self.assertRaises(ValueError):
+            apply_pragmas(cursor, {'busy_timeout': '1; DROP TABLE website_booking'})
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 4321})
+    def test_configure_connection(self):
+        """
+        settings.SQLITE_PRAGMAS are applied on connection init
+        """
+        configure_connection(None, connection)
+
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 4321)
+
+    def test_benchmark(self):
+        """
+        A short benchmark run reports throughput and latency
+        """
+        result = sqlite_concurrency.run({'busy_timeout': 5000}, processes=2, duration=0.2)
+
+        self.assertGreater(result['operations_per_second'], 0)
+        self.assertEqual(result['locked'], 0)
+        self.assertIn('write_p95_ms', result)
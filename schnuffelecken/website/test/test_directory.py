@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.test.utils import setup_test_environment
+
+from unittest import skipIf
+
+from website import directory
+from website.benchmarks import ldap_directory
+
+try:
+    from website.ldap_backend import PooledLDAPBackend
+except ImportError:
+    PooledLDAPBackend = None
+
+setup_test_environment()
+
+URI = "ldap://ldap.example.org"
+ALICE = "uid=alice,ou=people,dc=example,dc=org"
+BOB = "uid=bob,ou=people,dc=example,dc=org"
+
+
+class PooledLDAPTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.standin = ldap_directory.Directory({
+            ALICE: ("secret", {"givenName": [b"Alice"], "sn": [b"Liddell"]}),
+            BOB: ("secret", {"givenName": [b"Bob"], "sn": [b"Baumeister"]}),
+        })
+        self.ldap = directory.PooledLDAP(self.standin)
+
+    def test_connection_is_reused(self):
+        """
+        Several logins of a thread share one connection and one TLS handshake
+        """
+        ldap_directory.login(self.ldap, URI, ALICE, "secret")
+        ldap_directory.login(self.ldap, URI, BOB, "secret")
+
+        self.assertEqual(self.standin.calls["initialize"], 1)
+        self.assertEqual(self.standin.calls["start_tls_s"], 1)
+        self.assertEqual(self.standin.calls["simple_bind_s"], 2)
+
+    def test_wrong_password(self):
+        ldap_directory.login(self.ldap, URI, ALICE, "secret")
+
+        with self.assertRaises(ldap_directory.INVALID_CREDENTIALS):
+            ldap_directory.login(self.ldap, URI, BOB, "wrong")
+
+    def test_reconnect(self):
+        """
+        A lost connection is opened again (with TLS) on the next bind
+        """
+        ldap_directory.login(self.ldap, URI, ALICE, "secret")
+        self.ldap.initialize(URI).connection.down = True
+
+        ldap_directory.login(self.ldap, URI, ALICE, "secret")
+
+        self.assertEqual(self.standin.calls["initialize"], 2)
+        self.assertEqual(self.standin.calls["start_tls_s"], 2)
+
+    @override_settings(LDAP_ATTRIBUTE_CACHE_TIMEOUT_IN_SECONDS=60)
+    def test_attributes_are_cached_per_user(self):
+        alice = ldap_directory.login(self.ldap, URI, ALICE, "secret")
+        ldap_directory.login(self.ldap, URI, ALICE, "secret")
+        bob = ldap_directory.login(self.ldap, URI, BOB, "secret")
+
+        self.assertEqual(self.standin.calls["search_s"], 2)
+        self.assertEqual(alice[0][1]["givenName"], [b"Alice"])
+        self.assertEqual(bob[0][1]["givenName"], [b"Bob"])
+
+    @override_settings(LDAP_ATTRIBUTE_CACHE_TIMEOUT_IN_SECONDS=0)
+    def test_attribute_cache_disabled(self):
+        ldap_directory.login(self.ldap, URI, ALICE, "secret")
+        ldap_directory.login(self.ldap, URI, ALICE, "secret")
+
+        self.assertEqual(self.standin.calls["search_s"], 2)
+
+    def test_timings(self):
+        self.standin.bind_delay = 0.01
+        directory.reset_timings()
+
+        ldap_directory.login(self.ldap, URI, ALICE, "secret")
+
+        self.assertGreaterEqual(directory.timings()["bind"], 0.01)
+
+    def test_benchmark(self):
+        result = ldap_directory.run(logins=20, users=5, threads=2, handshake_delay=0)
+
+        self.assertEqual(result["calls"]["initialize"], 2)
+        self.assertEqual(result["calls"]["simple_bind_s"], 20)
+
+
+@skipIf(PooledLDAPBackend is None, "django_auth_ldap is not installed")
+@override_settings(AUTH_LDAP_SERVER_URI=URI,
+                   AUTH_LDAP_USER_DN_TEMPLATE="uid=%(user)s,ou=people,dc=example,dc=org",
+                   AUTH_LDAP_USER_ATTR_MAP={"first_name": "givenName", "last_name": "sn"},
+                   AUTH_LDAP_START_TLS=True)
+class PooledLDAPBackendTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.standin = ldap_directory.Directory({
+            ALICE: ("secret", {"givenName": [b"Alice"], "sn": [b"Liddell"]}),
+            BOB: ("secret", {"givenName": [b"Bob"], "sn": [b"Baumeister"]}),
+        })
+        PooledLDAPBackend._pooled_ldap = directory.PooledLDAP(self.standin)
+
+    def tearDown(self):
+        PooledLDAPBackend._pooled_ldap = None
+
+    def test_logins_share_connection(self):
+        backend = PooledLDAPBackend()
+
+        alice = backend.authenticate(None, username="alice", password="secret")
+        bob = backend.authenticate(None, username="bob", password="secret")
+
+        self.assertEqual((alice.first_name, bob.last_name), ("Alice", "Baumeister"))
+        self.assertIsNone(backend.authenticate(None, username="bob", password="wrong"))
+        self.assertEqual(self.standin.calls["initialize"], 1)
+        self.assertEqual(self.standin.calls["start_tls_s"], 1)
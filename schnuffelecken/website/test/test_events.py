@@ -0,0 +1,97 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, Client, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+import json
+from datetime import datetime, timedelta
+
+from website.events import *
+from website.models import *
+from website.viewmodels import *
+
+setup_test_environment()
+
+
+def parse_events(content):
+    """Return the data of all slots events of a stream"""
+    return [json.loads(chunk.split("data: ", 1)[1])
+            for chunk in content.split("\n\n") if "event: slots" in chunk]
+
+
+@override_settings(EVENT_STREAM_DURATION_IN_SECONDS=0)
+class EventsViewTests(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('events', kwargs={'facility': 'g'})
+
+    def test_stream_is_an_event_stream(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("text/event-stream", response["Content-Type"])
+
+    def test_no_events_if_client_is_up_to_date(self):
+        """
+        A client knowing the current version does not get any blocks
+        """
+        version = FacilityVersion.get('g')
+
+        response = self.client.get(self.url, {'version': version})
+        content = b"".join(response.streaming_content).decode()
+
+        self.assertTrue(content.startswith("retry: "))
+        self.assertEqual([], parse_events(content))
+
+    def test_all_blocks_if_client_is_outdated(self):
+        """
+        A client with an outdated version gets all blocks of the period,
+        last event id takes precedence over the version of the page
+        """
+        version = FacilityVersion.get('g')
+
+        response = self.client.get(
+            self.url, {'version': version}, HTTP_LAST_EVENT_ID="outdated")
+        content = b"".join(response.streaming_content).decode()
+        events = parse_events(content)
+
+        self.assertEqual(1, len(events))
+        self.assertEqual(4 * 5 * 11, len(events[0]))
+
+
+class SlotEventsTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.get_or_create(
+            username='max', first_name="Max", last_name="Mustermann")[0]
+        self.date = (BookingPeriod().start + timedelta(7)).replace(hour=10)
+
+    @override_settings(EVENT_STREAM_POLL_INTERVAL_IN_SECONDS=0)
+    def test_only_changed_blocks_are_sent(self):
+        """
+        After a booking, only the booked block should be sent,
+        reserved for the owner and booked for everybody else
+        """
+        own = slot_events('g', self.user, FacilityVersion.get('g'))
+        other = slot_events('g', None, FacilityVersion.get('g'))
+        next(own)
+        next(other)
+
+        Booking(date=self.date, user=self.user.username, facility='g').save()
+
+        own_blocks = parse_events(next(own))[0]
+        other_blocks = parse_events(next(other))[0]
+
+        self.assertEqual(1, len(own_blocks))
+        self.assertEqual(str(self.date.timestamp()),
+                         own_blocks[0]["timestamp"])
+        self.assertEqual("reserved", own_blocks[0]["available"])
+        self.assertEqual("booked", other_blocks[0]["available"])
+
+    def test_changed_blocks(self):
+        date = datetime(2030, 3, 11, 8)
+        old = {1: BlockAvailable(date), 2: BlockBooked(date)}
+        new = {1: BlockAvailable(date), 2: BlockAvailable(date)}
+
+        self.assertEqual([new[2]], changed_blocks(old, new))
@@ -0,0 +1,94 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.test.utils import setup_test_environment
+from django.utils.six import StringIO
+
+from datetime import date, datetime
+
+from website import export
+from website.models import Booking, HourlyStatistic, Statistic
+
+setup_test_environment()
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        for day in range(6, 11):
+            Booking(date=datetime(2017, 3, day, 8), user="max", facility='g').save()
+        Booking(date=datetime(2017, 3, 6, 9), user="eva", facility='h').save()
+        Statistic(year=2016, calendar_week=52, facility='g', bookings=7).save()
+        Statistic(year=2017, calendar_week=10, facility='g', bookings=5).save()
+        HourlyStatistic(date=date(2017, 3, 6), hour=8, facility='g', bookings=1).save()
+
+    def test_rows_in_chunks(self):
+        """
+        Rows are read with one query per chunk
+        """
+        with self.assertNumQueries(3):
+            rows = list(export.rows('bookings', chunk_size=3))
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0], (datetime(2017, 3, 6, 8), 'g', 'max'))
+
+    def test_rows_of_facility_and_date_range(self):
+        rows = list(export.rows('bookings', 'g', date(2017, 3, 7), date(2017, 3, 9)))
+
+        self.assertEqual([row[0].day for row in rows], [7, 8, 9])
+
+    def test_statistics_of_date_range(self):
+        rows = list(export.rows('statistics', start=date(2017, 3, 6), end=date(2017, 3, 12)))
+
+        self.assertEqual(rows, [(2017, 10, 'g', 5)])
+
+    def test_csv(self):
+        content = "".join(export.lines('hourly', 'csv'))
+
+        self.assertEqual(content, "date,hour,facility,bookings\n2017-03-06,8,g,1\n")
+
+    def test_jsonl(self):
+        lines = list(export.lines('bookings', 'jsonl', 'h'))
+
+        self.assertEqual([json.loads(line) for line in lines], [
+            {"date": "2017-03-06T09:00:00", "facility": "h", "user": "eva"}])
+
+    def test_view_streams_for_staff_only(self):
+        client = Client()
+        User.objects.create_user("chef", password="secret", is_staff=True)
+
+        self.assertEqual(302, client.get('/export/bookings/').status_code)
+
+        client.login(username="chef", password="secret")
+        response = client.get('/export/bookings/', {"format": "jsonl", "facility": "g",
+                                                    "von": "2017-03-10", "bis": "2017-03-10"})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], export.FORMATS['jsonl'])
+        self.assertIn('bookings.jsonl', response['Content-Disposition'])
+        self.assertEqual(b"".join(response.streaming_content).decode('utf-8').count("\n"), 1)
+
+    def test_command_writes_gzip(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        output = os.path.join(directory, 'bookings.csv.gz')
+
+        call_command('export', 'bookings', '--facility', 'g', '--output', output,
+                     '--chunk-size', '2', stdout=StringIO())
+
+        with gzip.open(output, 'rt', encoding='utf-8') as exported:
+            self.assertEqual(len(exported.readlines()), 6)
+
+    def test_command_writes_stdout(self):
+        out = StringIO()
+
+        call_command('export', 'statistics', '--format', 'jsonl', '--from', '2017-01-01', stdout=out)
+
+        self.assertEqual(json.loads(out.getvalue()), {
+            "year": 2017, "calendar_week": 10, "facility": "g", "bookings": 5})
@@ -0,0 +1,60 @@
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.test.utils import setup_test_environment
+from django.contrib.auth import authenticate
+
+from datetime import datetime
+
+from website.benchmarks import load
+from website.models import *
+
+setup_test_environment()
+
+LOAD_TEST_SETTINGS = {
+    'AUTHENTICATION_BACKENDS': ['website.backends.LoadTestBackend'],
+    'LOAD_TEST_PASSWORD': 'secret',
+}
+
+
+class LoadTestBackendTests(TestCase):
+
+    @override_settings(**LOAD_TEST_SETTINGS)
+    def test_authenticate(self):
+        """
+        Any user with the load test password is accepted and created
+        """
+        self.assertEqual(authenticate(username='9000001', password='secret').username, '9000001')
+        self.assertIsNone(authenticate(username='9000001', password='wrong'))
+
+    @override_settings(AUTHENTICATION_BACKENDS=['website.backends.LoadTestBackend'],
+                       LOAD_TEST_PASSWORD=None)
+    def test_disabled_without_password(self):
+        self.assertIsNone(authenticate(username='9000001', password=''))
+        self.assertIsNone(authenticate(username='9000001', password=None))
+
+
+class LoadGeneratorTests(LiveServerTestCase):
+
+    def test_bookable_slots(self):
+        """
+        Only future slots are used, hot spots are on Monday 10:00
+        """
+        now = datetime(2030, 3, 13, 12)
+        slots, hot_spots = load.bookable_slots(now)
+
+        self.assertTrue(all(slot > now for slot in slots))
+        self.assertTrue(all(slot.weekday() == 0 and slot.hour == 10 for slot in hot_spots))
+        self.assertEqual(len(hot_spots), 3)
+
+    @override_settings(**LOAD_TEST_SETTINGS)
+    def test_run(self):
+        """
+        A student logs in, books and cancels without server errors.
+        (Only one, as the shared in-memory test database locks whole tables.)
+        """
+        summary = load.run(self.live_server_url, 'secret', students=1,
+                           duration=2, think_time=0.05)
+
+        self.assertGreater(summary["requests_per_second"], 0)
+        self.assertEqual(summary["error_rate"], 0)
+        self.assertEqual(summary["actions"]["login"]["ok"], 1)
+        self.assertTrue(Booking.objects.exists() or summary["actions"].get("cancel"))
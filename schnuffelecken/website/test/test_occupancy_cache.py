@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.utils import setup_test_environment
+
+from datetime import datetime
+
+from website.models import *
+from website.viewmodels import *
+
+setup_test_environment()
+
+
+class OccupancyCacheTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.get_or_create(
+            username='max', first_name="Max", last_name="Mustermann")[0]
+        self.someone = User.objects.get_or_create(
+            username='peter', first_name="Peter", last_name="Müller")[0]
+        self.monday = datetime(2030, 3, 11)
+
+        Booking(date=datetime(2030, 3, 11, 8),
+                user=self.user.username, facility='g').save()
+
+    def load(self, facility='g'):
+        booking_period = BookingPeriod(self.monday)
+        booking_period.load_bookings(facility)
+        return booking_period.weeks[0].days[0]
+
+    def test_second_load_does_not_query_bookings(self):
+        """
+        Once cached, only the facility version needs to be read
+        """
+        self.load()
+
+        with self.assertNumQueries(1):
+            self.load()
+
+    def test_cache_is_shared_but_reservations_are_per_user(self):
+        """
+        The cached occupancy is the same for all users, but only the
+        owner should see a booking as reserved
+        """
+        own = self.load().get_bookings('g', self.user)[0]
+        other = self.load().get_bookings('g', self.someone)[0]
+
+        self.assertEqual(type(own), BlockReserved)
+        self.assertEqual(type(other), BlockBooked)
+
+    def test_booking_invalidates_cache(self):
+        self.load()
+
+        Booking(date=datetime(2030, 3, 11, 9),
+                user=self.someone.username, facility='g').save()
+
+        self.assertEqual(self.load().slots[1], self.someone.username)
+
+    def test_cancellation_invalidates_cache(self):
+        self.load()
+
+        Booking.objects.get(date=datetime(2030, 3, 11, 8)).delete()
+
+        self.assertEqual(self.load().slots[0], None)
+
+    def test_bulk_delete_invalidates_cache(self):
+        self.load()
+
+        Booking.objects.filter(facility='g').delete()
+
+        self.assertEqual(self.load().slots[0], None)
+
+    def test_moving_a_booking_invalidates_both_facilities(self):
+        self.load('g')
+        self.load('h')
+
+        booking = Booking.objects.get(date=datetime(2030, 3, 11, 8))
+        booking.facility = 'h'
+        booking.save()
+
+        self.assertEqual(self.load('g').slots[0], None)
+        self.assertEqual(self.load('h').slots[0], self.user.username)
+
+    def test_change_of_other_facility_keeps_cache(self):
+        self.load('g')
+        version = FacilityVersion.get('g')
+
+        Booking(date=datetime(2030, 3, 11, 8),
+                user=self.someone.username, facility='h').save()
+
+        self.assertEqual(FacilityVersion.get('g'), version)
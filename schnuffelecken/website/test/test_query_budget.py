@@ -0,0 +1,97 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from datetime import timedelta
+
+from website.models import *
+from website.db import QueryCounter
+from website.test.utils import QueryBudgetMixin
+
+setup_test_environment()
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    Upper bounds for the number of SQL queries of the main pages,
+    so a template or viewmodel change cannot silently add queries per block.
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.get_or_create(
+            username='max', first_name="Max", last_name="Mustermann")[0]
+        self.client.force_login(self.user)
+        cache.clear()
+
+    def book_all_day(self, count):
+        """Book the first hours of the first days of next week by different users"""
+        monday = BookingPeriod().start + timedelta(7)
+        for i in range(0, count):
+            Booking(date=monday + timedelta(days=i % 5, hours=8 + i // 5),
+                    user="user{0}".format(i), facility='g').save()
+        cache.clear()
+
+    def test_bookings(self):
+        # session, user, facility version, occupancy, quota
+        with self.assertMaxQueries(5):
+            response = self.client.get(reverse('bookings', kwargs={"facility": "g"}))
+        self.assertEqual(response.status_code, 200)
+
+    def test_bookings_does_not_depend_on_number_of_bookings(self):
+        """
+        The queries of the bookings page are the same for an empty and a full week
+        """
+        with QueryCounter() as empty:
+            self.client.get(reverse('bookings', kwargs={"facility": "g"}))
+
+        self.book_all_day(25)
+
+        with self.assertMaxQueries(empty.count):
+            self.client.get(reverse('bookings', kwargs={"facility": "g"}))
+
+    def test_status(self):
+        self.book_all_day(25)
+
+        # session, user, change marker, facility version, occupancy
+        with self.assertMaxQueries(5):
+            response = self.client.get(reverse('status', kwargs={"facility": "g"}))
+        self.assertEqual(response.status_code, 200)
+
+    def test_login(self):
+        self.client.logout()
+
+        with self.assertMaxQueries(0):
+            response = self.client.get(reverse('login'))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_COUNT_HEADER=True)
+    def test_server_timing_header(self):
+        """
+        The number of queries and their time are sent as Server-Timing header
+        """
+        response = self.client.get(reverse('status', kwargs={"facility": "g"}))
+
+        self.assertRegex(response['Server-Timing'], r'^db;desc="\d+ queries";dur=[\d.]+$')
+
+    @override_settings(QUERY_COUNT_HEADER=False)
+    def test_no_server_timing_header(self):
+        response = self.client.get(reverse('status', kwargs={"facility": "g"}))
+
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_query_counter_wraps_execution(self):
+        """
+        The counter neither logs the statements nor needs the debug cursor
+        """
+        with QueryCounter() as counter:
+            Booking(date=BookingPeriod().start + timedelta(7, hours=8), user="max", facility='g').save()
+
+        self.assertFalse(connection.force_debug_cursor)
+        self.assertEqual(len(connection.queries_log), 0)
+        self.assertGreater(counter.count, len(counter.writes))
+        self.assertTrue(counter.writes[0].startswith('INSERT INTO "website_booking"'))
+        self.assertGreater(counter.time, 0)
@@ -0,0 +1,127 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+
+import re
+from datetime import timedelta
+
+from website.models import *
+from website.views import handle_cancellation
+
+setup_test_environment()
+
+# any scan of a table is a full scan, also "USING (COVERING) INDEX"
+# (the whole index is read), only SEARCH uses an index to find the rows;
+# a plain "SEARCH <table>" is the lookup of MIN/MAX at the end of the index
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?(?!SUBQUERY\b|CONSTANT ROW\b)(?P<table>\w+)')
+INDEX_SEARCH = re.compile(r'\bSEARCH (TABLE )?\w+($| .*USING .*(INDEX|PRIMARY KEY))')
+
+
+class QueryPlanTests(TestCase):
+    """
+    Run EXPLAIN QUERY PLAN on the queries of the hot paths
+    and fail if any of them scans a whole table.
+    """
+
+    def setUp(self):
+        self.user = User.objects.get_or_create(
+            username='max', first_name="Max", last_name="Mustermann")[0]
+        self.monday = BookingPeriod().start + timedelta(7)
+
+        for hour in (8, 9, 10):
+            Booking(date=self.monday.replace(hour=hour),
+                    user=self.user.username, facility='g').save()
+
+    def query_plans(self, function, *args):
+        """Call function and return (sql, plan detail) of its SELECT queries"""
+        if connection.vendor != 'sqlite':
+            self.skipTest("EXPLAIN QUERY PLAN is specific to SQLite")
+
+        with CaptureQueriesContext(connection) as context:
+            function(*args)
+
+        plans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                if query['sql'].startswith('SELECT'):
+                    cursor.execute("EXPLAIN QUERY PLAN " + query['sql'])
+                    plans.extend((query['sql'], row[-1]) for row in cursor.fetchall())
+
+        self.assertTrue(plans)
+        return plans
+
+    def assertNoFullScans(self, function, *args):
+        """Every table is searched through an index, none is scanned"""
+        for sql, detail in self.query_plans(function, *args):
+            message = "{0}\n{1}".format(sql, detail)
+            self.assertIsNone(FULL_SCAN.search(detail), message)
+            if detail.startswith('SEARCH'):
+                self.assertRegex(detail, INDEX_SEARCH, message)
+
+    def assertCoveredOccupancy(self, function, *args):
+        """The occupancy of a facility is read from the index alone"""
+        details = [detail for sql, detail in self.query_plans(function, *args)
+                   if 'website_booking' in detail]
+
+        self.assertTrue(details)
+        for detail in details:
+            self.assertIn("COVERING INDEX", detail)
+            self.assertIn("facility=?", detail)
+
+    def test_day_get_bookings(self):
+        """
+        The occupancy of a day is read from the (facility, date, user) index
+        """
+        self.assertNoFullScans(Day(self.monday).get_bookings, 'g', self.user)
+        self.assertCoveredOccupancy(Day(self.monday).get_bookings, 'g', self.user)
+
+    def test_booking_period_load_bookings(self):
+        """
+        The occupancy of a period is read from the (facility, date, user) index
+        """
+        self.assertNoFullScans(BookingPeriod().load_bookings, 'g')
+        cache.clear()
+        self.assertCoveredOccupancy(BookingPeriod().load_bookings, 'g')
+
+    def test_get_user_quota(self):
+        """
+        The quota is read from the (user, week) counters
+        """
+        self.assertNoFullScans(Booking.get_user_quota, self.user.username)
+
+    def test_remove_old(self):
+        """
+        Old bookings are found by their date
+        """
+        self.assertNoFullScans(Booking.remove_old, None, self.monday + timedelta(hours=12))
+
+    def test_roll_up(self):
+        """
+        The bookings to accumulate are found by their date and id
+        """
+        Booking(date=(self.monday - timedelta(14)).replace(hour=10),
+                user=self.user.username, facility='h').save()
+
+        self.assertNoFullScans(Statistic.roll_up)
+
+    def test_handle_cancellation(self):
+        """
+        The booking to cancel is found by (date, facility)
+        """
+        request = RequestFactory().post(
+            '/', {"cancel": self.monday.replace(hour=8).timestamp()})
+        request.user = self.user
+
+        self.assertNoFullScans(handle_cancellation, request, 'g')
+
+    def test_heatmap(self):
+        """
+        The heatmap is summed up from the (date, facility, weekday, hour, bookings) index
+        """
+        start, end = self.monday.date() - timedelta(365), self.monday.date()
+        details = [detail for sql, detail in self.query_plans(HourlyStatistic.heatmap, start, end)]
+
+        self.assertNoFullScans(HourlyStatistic.heatmap, start, end, 'g')
+        self.assertTrue(any("COVERING INDEX" in detail for detail in details), details)
@@ -0,0 +1,37 @@
+from django.test import TestCase
+from django.test.utils import setup_test_environment
+
+from website.benchmarks import sessions
+
+setup_test_environment()
+
+
+class SessionEngineTests(TestCase):
+
+    def test_database_sessions_write(self):
+        result = sessions.measure('django.contrib.sessions.backends.db', page_views=2)
+
+        self.assertGreater(result["session_writes"], 0)
+
+    def test_signed_cookies_do_not_write(self):
+        """
+        With signed cookies, the session causes no database writes
+        """
+        result = sessions.measure('django.contrib.sessions.backends.signed_cookies', page_views=2)
+
+        self.assertEqual(result["requests"], 5)
+        self.assertEqual(result["session_writes"], 0)
+
+    def test_login_with_every_engine(self):
+        """
+        Every engine keeps the user logged in between requests
+        """
+        for engine in sessions.ENGINES:
+            with self.settings(SESSION_ENGINE=engine,
+                               AUTHENTICATION_BACKENDS=['website.backends.LoadTestBackend'],
+                               LOAD_TEST_PASSWORD='secret'):
+                self.client.post('/login/', {'username': '9000001', 'password': 'secret'})
+                response = self.client.get('/buchungen/g/')
+                self.client.get('/logout/')
+
+            self.assertEqual(response.status_code, 200, engine)
@@ -0,0 +1,68 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.test.utils import setup_test_environment
+
+from website import storage
+from website.benchmarks import static_assets
+from website.storage import CompressedManifestStaticFilesStorage
+
+setup_test_environment()
+
+
+class StaticFilesTests(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def collect(self):
+        with override_settings(STATIC_ROOT=self.root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            return CompressedManifestStaticFilesStorage()
+
+    def test_uses_plain_names_without_manifest(self):
+        with override_settings(STATIC_ROOT=self.root):
+            url = CompressedManifestStaticFilesStorage().url('website/style.css')
+
+        self.assertEqual(url, '/static/website/style.css')
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        collected = self.collect()
+        url = collected.url('website/style.css')
+        name = url[len('/static/'):]
+
+        self.assertRegex(url, r'^/static/website/style\.[0-9a-f]{12}\.css$')
+        self.assertTrue(os.path.exists(os.path.join(self.root, name + '.gz')))
+        with open(os.path.join(self.root, name), 'rb') as original:
+            with gzip.open(os.path.join(self.root, name + '.gz'), 'rb') as compressed:
+                self.assertEqual(compressed.read(), original.read())
+
+        # images are compressed already
+        image = collected.url('website/background.png')[len('/static/'):]
+        self.assertFalse(os.path.exists(os.path.join(self.root, image + '.gz')))
+
+    @unittest.skipIf(storage.brotli is None, "brotli is not installed")
+    def test_collectstatic_writes_brotli_files(self):
+        name = self.collect().url('website/slots.js')[len('/static/'):]
+
+        self.assertTrue(os.path.exists(os.path.join(self.root, name + '.br')))
+
+    def test_compress_drops_variants_without_saving(self):
+        self.assertEqual(storage.compress(b'{}'), {})
+        self.assertIn('gz', storage.compress(b'.table { width: 100%; }\n' * 100))
+
+    def test_report_counts_requests_of_page(self):
+        result = static_assets.run(['website/status.html'])['website/status.html']
+
+        self.assertEqual(sorted(result["assets"]), [
+            'website/bootstrap-3.3.7-dist/css/bootstrap.min.css',
+            'website/slots.js',
+            'website/style.css'])
+        self.assertEqual(result["requests"], len(result["assets"]) + len(result["external"]))
+        self.assertLess(result["sent"], result["bytes"])
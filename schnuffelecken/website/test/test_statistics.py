@@ -3,6 +3,8 @@ from django.db.utils import IntegrityError
 from django.test import TestCase
 from django.test.utils import setup_test_environment
 
+from datetime import date
+
 from website.models import *
 
 setup_test_environment()
@@ -138,3 +140,128 @@ class StatisticTests(TestCase):
             year=2018, calendar_week=10, facility='h').bookings, 1)
         self.assertEqual(Statistic.objects.get(
             year=2018, calendar_week=10, facility='g').bookings, 1)
+
+    def test_accumulate_adds_to_existing_statistics(self):
+        """
+        Accumulating again should add to existing rows and create missing ones
+        """
+        Statistic(year=2017, calendar_week=10, facility='g', bookings=4).save()
+
+        Statistic.accumulate([
+            Booking(date=datetime(2017, 3, 6, 8), user="horst", facility="g"),
+            Booking(date=datetime(2017, 3, 6, 9), user="horst", facility="h"),
+        ])
+
+        self.assertEqual(Statistic.objects.get(
+            year=2017, calendar_week=10, facility='g').bookings, 5)
+        self.assertEqual(Statistic.objects.get(
+            year=2017, calendar_week=10, facility='h').bookings, 1)
+
+    def test_accumulate_query_set_with_constant_number_of_queries(self):
+        """
+        Accumulating a query set should not cost queries per booking
+        """
+        for day in range(0, 5):
+            for hour in range(8, 19):
+                Booking(date=datetime(2017, 3, 6 + day, hour),
+                        user="horst", facility="g").save()
+                Booking(date=datetime(2017, 3, 13 + day, hour),
+                        user="horst", facility="h").save()
+        Statistic(year=2017, calendar_week=10, facility='g', bookings=1).save()
+
+        # aggregate, weekly: select existing, update, insert,
+        # hourly: select existing, insert (plus a savepoint each)
+        with self.assertNumQueries(10):
+            Statistic.accumulate(Booking.objects.all())
+
+        self.assertEqual(Statistic.objects.get(
+            year=2017, calendar_week=10, facility='g').bookings, 56)
+        self.assertEqual(Statistic.objects.get(
+            year=2017, calendar_week=11, facility='h').bookings, 55)
+
+    def test_accumulate_nothing(self):
+        with self.assertNumQueries(0):
+            Statistic.accumulate(Booking.objects.none())
+
+        self.assertEqual(Statistic.objects.count(), 0)
+
+    def test_accumulate_hourly_statistics(self):
+        """
+        Bookings are also counted per facility and hour, with their weekday
+        """
+        HourlyStatistic(date=date(2017, 3, 6), hour=8, facility='g', bookings=2).save()
+
+        Statistic.accumulate([
+            Booking(date=datetime(2017, 3, 6, 8), user="horst", facility="g"),
+            Booking(date=datetime(2017, 3, 6, 8), user="horst", facility="h"),
+            Booking(date=datetime(2017, 3, 8, 17), user="horst", facility="g"),
+        ])
+
+        self.assertEqual(HourlyStatistic.objects.get(
+            date=date(2017, 3, 6), hour=8, facility='g').bookings, 3)
+        self.assertEqual(HourlyStatistic.objects.get(
+            date=date(2017, 3, 6), hour=8, facility='h').bookings, 1)
+        self.assertEqual(HourlyStatistic.objects.get(
+            date=date(2017, 3, 8), hour=17, facility='g').weekday, 2)
+
+    def test_heatmap_sums_up_weekday_and_hour(self):
+        for day, hour, facility in [(6, 8, 'g'), (6, 8, 'h'), (13, 8, 'g'),
+                                    (14, 9, 'g'), (20, 8, 'g')]:
+            HourlyStatistic(date=date(2017, 3, day), hour=hour,
+                            facility=facility, bookings=1).save()
+
+        start, end = date(2017, 3, 6), date(2017, 3, 19)
+        self.assertEqual(HourlyStatistic.heatmap(start, end), {(0, 8): 3, (1, 9): 1})
+        self.assertEqual(HourlyStatistic.heatmap(start, end, 'g'), {(0, 8): 2, (1, 9): 1})
+
+    def test_roll_up_started_bookings_once(self):
+        """
+        Rolling up counts the bookings that have started, each of them once
+        """
+        monday = datetime(2017, 3, 6, 8)
+        # as before the first roll up (the migration sets the mark to its time)
+        StatisticRollup.objects.update(until=StatisticRollup.beginning)
+        Booking(date=monday, user="horst", facility="g").save()
+        Booking(date=monday + timedelta(hours=2), user="horst", facility="g").save()
+
+        self.assertEqual(Statistic.roll_up(monday + timedelta(hours=1)), 1)
+        self.assertEqual(Statistic.roll_up(monday + timedelta(hours=1)), 0)
+        self.assertEqual(Statistic.roll_up(monday + timedelta(hours=2)), 1)
+
+        self.assertEqual(Statistic.objects.get(
+            year=2017, calendar_week=10, facility='g').bookings, 2)
+        self.assertEqual(HourlyStatistic.objects.get(
+            date=date(2017, 3, 6), hour=10, facility='g').bookings, 1)
+
+    def test_roll_up_bookings_inserted_in_the_past(self):
+        """
+        Bookings inserted for hours that were rolled up already are counted as well
+        """
+        monday = datetime(2017, 3, 6, 8)
+        Statistic.roll_up(monday + timedelta(days=1))
+        Booking(date=monday, user="horst", facility="h").save()
+
+        self.assertEqual(Statistic.roll_up(monday + timedelta(days=1)), 1)
+        self.assertEqual(Statistic.roll_up(monday + timedelta(days=1)), 0)
+        self.assertEqual(Statistic.objects.get(
+            year=2017, calendar_week=10, facility='h').bookings, 1)
+
+    def test_roll_up_does_not_count_future_bookings(self):
+        tomorrow = datetime.now() + timedelta(days=1)
+        Booking(date=tomorrow.replace(hour=10, minute=0, second=0, microsecond=0),
+                user="horst", facility="g").save()
+
+        self.assertEqual(Statistic.roll_up(), 0)
+        self.assertEqual(Statistic.objects.count(), 0)
+
+    def test_roll_up_is_limited_to_current_hour(self):
+        """
+        Bookings that can still be cancelled are not counted, even if asked for
+        """
+        tomorrow = (datetime.now() + timedelta(days=1)).replace(
+            hour=10, minute=0, second=0, microsecond=0)
+        Booking(date=tomorrow, user="horst", facility="g").save()
+
+        self.assertEqual(Statistic.roll_up(tomorrow + timedelta(hours=1)), 0)
+        self.assertEqual(StatisticRollup.objects.get().until, StatisticRollup.current_hour())
+        self.assertFalse(StatisticRollup.is_behind())
@@ -0,0 +1,70 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, Client
+from django.test.utils import setup_test_environment
+
+from datetime import date
+
+from website.db import QueryCounter
+from website.models import HourlyStatistic, StatisticRollup
+
+setup_test_environment()
+
+
+class StatisticsPageTests(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.staff = User.objects.create_user("chef", password="secret", is_staff=True)
+        HourlyStatistic(date=date(2017, 3, 6), hour=10, facility='g', bookings=1).save()
+        HourlyStatistic(date=date(2017, 3, 13), hour=10, facility='h', bookings=1).save()
+
+    def test_only_for_staff(self):
+        User.objects.create_user("student", password="secret")
+        self.client.login(username="student", password="secret")
+
+        response = self.client.get('/statistik/')
+
+        self.assertEqual(302, response.status_code)
+
+    def test_heatmap_of_date_range(self):
+        self.client.login(username="chef", password="secret")
+
+        response = self.client.get('/statistik/', {"von": "2017-03-06", "bis": "2017-03-19"})
+        monday = response.context["heatmap"].rows[2].blocks[0]
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.context["heatmap"].total, 2)
+        self.assertEqual((monday.time, monday.bookings, monday.capacity), ("10:00", 2, 4))
+        self.assertContains(response, "50 %")
+
+    def test_heatmap_of_facility(self):
+        self.client.login(username="chef", password="secret")
+
+        response = self.client.get('/statistik/', {
+            "von": "2017-03-06", "bis": "2017-03-19", "facility": "h"})
+
+        self.assertEqual(response.context["heatmap"].total, 1)
+        self.assertEqual(response.context["heatmap"].rows[2].blocks[0].capacity, 2)
+
+    def test_invalid_range_falls_back_to_last_year(self):
+        self.client.login(username="chef", password="secret")
+
+        response = self.client.get('/statistik/', {"von": "2017-02-31", "bis": "gestern"})
+        heatmap = response.context["heatmap"]
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(heatmap.end, date.today())
+        self.assertEqual((heatmap.end - heatmap.start).days, 364)
+
+    def test_rolls_up_only_once_per_hour(self):
+        """
+        Once the statistics are rolled up for this hour, the page only reads
+        """
+        self.client.login(username="chef", password="secret")
+        self.client.get('/statistik/')
+
+        with QueryCounter() as counter:
+            self.client.get('/statistik/')
+
+        self.assertFalse(StatisticRollup.is_behind())
+        self.assertEqual(counter.writes, [])
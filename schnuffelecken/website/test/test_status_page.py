@@ -1,7 +1,9 @@
 from django.test import TestCase, Client
 from django.test.utils import setup_test_environment
 
-from website.models import BookingPeriod
+from datetime import datetime, timedelta
+
+from website.models import BookingPeriod, Booking
 
 setup_test_environment()
 
@@ -41,3 +43,58 @@ class StatusPageTests(TestCase):
         response = client.get("/status/")
 
         self.assertEqual(404, response.status_code)
+
+    def test_should_answer_not_modified_if_nothing_changed(self):
+        """
+        A kiosk refreshing the status page should get a 304 without
+        rendering the week again, as long as nothing changed
+        """
+        client = Client()
+
+        response = client.get('/status/g/')
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = client.get('/status/g/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
+
+    def test_should_answer_not_modified_since_last_modified(self):
+        client = Client()
+
+        response = client.get('/status/g/')
+        last_modified = response['Last-Modified']
+
+        response = client.get(
+            '/status/g/', HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(304, response.status_code)
+
+    def test_should_render_again_after_a_booking(self):
+        client = Client()
+        date = datetime.now().replace(
+            minute=0, second=0, microsecond=0) + timedelta(days=1)
+        date = date.replace(hour=12)
+
+        etag = client.get('/status/g/')['ETag']
+
+        Booking(date=date, user='max', facility='g').save()
+
+        response = client.get('/status/g/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_should_not_be_affected_by_other_facility(self):
+        client = Client()
+        date = datetime.now().replace(
+            minute=0, second=0, microsecond=0) + timedelta(days=1)
+        date = date.replace(hour=12)
+
+        etag = client.get('/status/g/')['ETag']
+
+        Booking(date=date, user='max', facility='h').save()
+
+        response = client.get('/status/g/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
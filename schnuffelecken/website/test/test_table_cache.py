@@ -0,0 +1,89 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.test import TestCase
+from django.test.utils import setup_test_environment
+
+from datetime import timedelta
+
+from website.models import *
+from website.templatetags.bookings_table import bookings_table, fragment_key, table_context
+from website.viewmodels import *
+
+setup_test_environment()
+
+
+class TableFragmentCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get_or_create(
+            username='max', first_name="Max", last_name="Mustermann")[0]
+        self.someone = User.objects.get_or_create(
+            username='peter', first_name="Peter", last_name="Müller")[0]
+        self.monday = BookingPeriod().start + timedelta(7)
+
+        Booking(date=self.monday.replace(hour=8),
+                user=self.user.username, facility='g').save()
+        Booking(date=self.monday.replace(hour=9),
+                user=self.someone.username, facility='g').save()
+
+    def week(self, user):
+        booking_period = BookingPeriod()
+        booking_period.load_bookings('g')
+        return WeekViewModel(booking_period.weeks[1], 'g', user, booking_period.version)
+
+    def uncached(self, week):
+        return get_template('table.html').render(table_context(week, 2))
+
+    def test_cached_table_equals_rendered_table(self):
+        """
+        Every user gets the same markup from the cache as without it
+        """
+        for user in (self.user, self.someone, self.user, None):
+            week = self.week(user)
+            self.assertEqual(bookings_table(week, 2), self.uncached(week))
+
+    def test_reserved_blocks_are_per_user(self):
+        bookings_table(self.week(self.user), 2)
+        html = bookings_table(self.week(self.someone), 2)
+
+        self.assertEqual(html.count('class="reserved'), 1)
+        self.assertEqual(html.count('class="booked'), 1)
+        self.assertIn('data-timestamp="{0}"'.format(
+            self.monday.replace(hour=9).timestamp()), html.split('class="reserved')[1])
+
+    def test_cache_is_used(self):
+        """
+        Once cached, the whole table is not rendered again
+        """
+        week = self.week(self.user)
+        bookings_table(week, 2)
+        cache.set(fragment_key(week, 2), "cached")
+
+        self.assertEqual(bookings_table(self.week(self.someone), 2), "cached")
+
+    def test_booking_changes_key(self):
+        key = fragment_key(self.week(self.user), 2)
+
+        Booking(date=self.monday.replace(hour=10),
+                user=self.someone.username, facility='g').save()
+
+        self.assertNotEqual(fragment_key(self.week(self.user), 2), key)
+        self.assertEqual(bookings_table(self.week(self.user), 2).count('class="booked'), 2)
+
+    def test_next_hour_changes_key(self):
+        """
+        Blocks become unbookable every hour, so the table is cached per hour
+        """
+        week = self.week(self.user)
+        key = fragment_key(week, 2)
+        week.created += timedelta(hours=1)
+
+        self.assertNotEqual(fragment_key(week, 2), key)
+
+    def test_not_cached_without_version(self):
+        week = WeekViewModel(BookingPeriod().weeks[1], 'g', self.user)
+
+        self.assertIsNone(fragment_key(week, 2))
+        self.assertEqual(bookings_table(week, 2), self.uncached(week))
@@ -1,5 +1,7 @@
 from django.test import TestCase
 
+from datetime import date
+
 from website.models import *
 from website.viewmodels import *
 
@@ -43,3 +45,36 @@ class ViewModelTests(TestCase):
         self.assertEqual(vm.headers[4][1], (now + timedelta(4)).strftime(pattern))
         self.assertEqual(len(vm.rows), 11)
         self.assertEqual(vm.calendar_week, 11, "Expected KW to be 11")
+
+    def test_blocks_share_their_texts(self):
+        date = datetime(2030, 3, 11, 10)
+        first = BlockBooked(date, now=datetime(2030, 3, 11, 8))
+        second = BlockBooked(date + timedelta(hours=1), now=datetime(2030, 3, 11, 12))
+
+        self.assertFalse(hasattr(first, '__dict__'))
+        self.assertIs(first.text, second.text)
+        self.assertEqual(first.label, "booked")
+        self.assertEqual(first.available, "booked")
+        self.assertEqual(first.timestamp, date.timestamp())
+        self.assertTrue(first.bookable)
+        self.assertFalse(second.bookable)
+        self.assertEqual(BlockReserved(date).text, "Reserviert")
+        self.assertEqual(BlockAvailable(date).text, "Block reservieren?")
+
+    def test_row_labels_are_shared(self):
+        self.assertIs(Row(9, []).time_start, Row(8, []).time_end)
+        self.assertEqual(Row(18, []).time_end, "19:00")
+
+    def test_heatmap_utilization(self):
+        # two mondays and two tuesdays, two facilities
+        start, end = date(2030, 3, 11), date(2030, 3, 19)
+        heatmap = HeatmapViewModel({(0, 8): 3, (1, 9): 1}, start, end,
+                                   ("Montag", "Dienstag"), range(8, 10), 2)
+
+        self.assertEqual([row.time_start for row in heatmap.rows], ["08:00", "09:00"])
+        monday = heatmap.rows[0].blocks[0]
+        self.assertEqual((monday.bookings, monday.capacity, monday.percent), (3, 4, 75))
+        self.assertEqual(heatmap.rows[1].blocks[0].percent, 0)
+        self.assertEqual(heatmap.total, 4)
+        self.assertEqual([(cell.day, cell.time) for cell in heatmap.peaks],
+                         [("Montag", "08:00"), ("Dienstag", "09:00")])
@@ -0,0 +1,24 @@
+from contextlib import contextmanager
+
+from website.db import QueryCounter
+
+"""
+Helpers shared by the tests.
+"""
+
+
+class QueryBudgetMixin(object):
+    """Assertions on the number of SQL queries of a TestCase"""
+
+    @contextmanager
+    def assertMaxQueries(self, number):
+        """
+        Fail if the block executes more than number queries. Unlike
+        assertNumQueries it does not break when fewer queries are needed.
+        """
+        with QueryCounter() as counter:
+            yield counter
+
+        self.assertLessEqual(
+            counter.count, number,
+            "{0} queries executed, at most {1} expected".format(counter.count, number))
@@ -1,11 +1,15 @@
 from django.conf.urls import url
 
-from . import views
+from . import api, views
 
 urlpatterns = [
     url(r'^$', views.index, name='index'),
     url(r'^login/$', views.login, name='login'),
     url(r'^buchungen/(?P<facility>[gh])/$', views.bookings, name='bookings'),
     url(r'^status/(?P<facility>[gh])/$', views.status, name='status'),
+    url(r'^events/(?P<facility>[gh])/$', views.events, name='events'),
     url(r'^logout/$', views.logout, name='logout'),
+    url(r'^statistik/$', views.statistics, name='statistics'),
+    url(r'^export/(?P<kind>bookings|statistics|hourly)/$', views.export, name='export'),
+    url(r'^api/(?P<facility>[gh])/slots/$', api.slots, name='api_slots'),
 ]
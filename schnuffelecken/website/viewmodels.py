@@ -1,4 +1,5 @@
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta
 
 
 class WeekViewModel(object):
@@ -6,31 +7,82 @@ class WeekViewModel(object):
     for easy table row creation looping.
     """
 
-    def __init__(self, week, facility, user):
-        self._day_names = ["Montag", "Dienstag",
-                           "Mittwoch", "Donnerstag", "Freitag"]
+    def __init__(self, week, facility, user, version=None):
+        # version of the facility's bookings and time of creation
+        # identify the rendered table (see templatetags/bookings_table.py)
+        self.facility = facility
+        self.version = version
+        self.first_day = week.days[0].date
+        self.created = week.now
         self.rows = []
-        self.headers = [(self._day_names[day.date.weekday()], day.date.strftime(
-            "%d.%m.%y"), day.date.date() == datetime.now().date()) for day in week.days]
+        today = week.now.date()
+        self.headers = [(day.skeleton.name, day.skeleton.label, day.date.date() == today)
+                        for day in week.days]
         self.calendar_week = week.calendar_week
         self._to_view_model(week, facility, user)
 
     def _to_view_model(self, week, facility, user):
+        days = [day.get_bookings(facility, user) for day in week.days]
 
         for hour in range(0, 11):
-            blocks = [week.days[day].get_bookings(
-                facility, user)[hour] for day in range(0, 5)]
+            blocks = [days[day][hour] for day in range(0, 5)]
             self.rows.append(Row(hour + 8, blocks))
 
 
+# "00:00" to "24:00", formatted once instead of for every row and cell
+HOUR_LABELS = ["{0:02d}:00".format(hour) for hour in range(0, 25)]
+
+
 class Row(object):
+    __slots__ = ('time_start', 'time_end', 'blocks')
 
     def __init__(self, hour, blocks):
-        self.time_start = "{0:02d}:00".format(hour)
-        self.time_end = "{0:02d}:00".format(hour + 1)
+        self.time_start = HOUR_LABELS[hour]
+        self.time_end = HOUR_LABELS[hour + 1]
         self.blocks = blocks
 
 
+class HeatmapViewModel(object):
+    """Transform bookings per (weekday, hour) into rows of hours with the
+    utilization of every weekday and rank the busiest slots. The capacity
+    of a slot is the number of its days in the range times the facilities.
+    """
+
+    def __init__(self, counts, start, end, day_names, hours, facilities, peaks=10):
+        days = Counter((start + timedelta(i)).weekday()
+                       for i in range(0, (end - start).days + 1))
+
+        self.start = start
+        self.end = end
+        self.headers = day_names
+        self.total = sum(counts.values())
+        self.rows = []
+        cells = []
+
+        for hour in hours:
+            row = [HeatmapCell(day_names[weekday], hour, counts.get((weekday, hour), 0),
+                               days[weekday] * facilities)
+                   for weekday in range(0, len(day_names))]
+            cells.extend(row)
+            self.rows.append(Row(hour, row))
+
+        self.peaks = sorted([cell for cell in cells if cell.bookings],
+                            key=lambda cell: (-cell.utilization, -cell.bookings))[:peaks]
+
+
+class HeatmapCell(object):
+    __slots__ = ('day', 'time', 'bookings', 'capacity', 'utilization', 'percent', 'opacity')
+
+    def __init__(self, day, hour, bookings, capacity):
+        self.day = day
+        self.time = HOUR_LABELS[hour]
+        self.bookings = bookings
+        self.capacity = capacity
+        self.utilization = float(bookings) / capacity if capacity else 0.0
+        self.percent = int(round(self.utilization * 100))
+        self.opacity = "{0:.2f}".format(min(self.utilization, 1.0))
+
+
 class AllOk(object):
 
     def __init__(self):
@@ -55,37 +107,66 @@ class GreenAlert(object):
         self.css = "label-xl label-success"
 
 
-class BlockAvailable(object):
+class Block(object):
+    """
+    A cell of the booking table. The texts are the same for all blocks
+    of a state and live in the class, a block only holds its slot.
+    """
+    __slots__ = ('date', 'timestamp', 'bookable')
 
-    def __init__(self, date):
-        self.label = "available"
-        self.text = "Block reservieren?"
+    label = None
+    text = None
+    available = None
+
+    def __init__(self, date, timestamp=None, now=None):
         self.date = date
-        self.timestamp = date.timestamp()
-        self.available = "available"
-        self.bookable = self.date > datetime.now()
+        self.timestamp = date.timestamp() if timestamp is None else timestamp
+        self.bookable = date > (now or datetime.now())
 
 
-class BlockBooked(object):
+class BlockAvailable(Block):
+    __slots__ = ()
 
-    def __init__(self, date):
-        self.label = "booked"
-        self.text = "Belegt"
-        self.date = date
-        self.timestamp = date.timestamp()
-        self.available = "booked"
-        self.bookable = self.date > datetime.now()
+    label = "available"
+    text = "Block reservieren?"
+    available = "available"
 
 
-class BlockReserved(object):
+class BlockBooked(Block):
+    __slots__ = ()
 
-    def __init__(self, date):
-        self.label = "reserved"
-        self.text = "Reserviert"
-        self.date = date
-        self.timestamp = self.date.timestamp()
-        self.available = "reserved"
-        self.bookable = self.date > datetime.now()
+    label = "booked"
+    text = "Belegt"
+    available = "booked"
+
+
+class BlockReserved(Block):
+    __slots__ = ()
+
+    label = "reserved"
+    text = "Reserviert"
+    available = "reserved"
+
+
+def block_data(block):
+    """
+    Serializable representation of a block. The timestamp is a string,
+    exactly as it is rendered into the data-timestamp attribute of the table.
+    """
+    return {
+        "timestamp": str(block.timestamp),
+        "label": block.label,
+        "text": block.text,
+        "available": block.available,
+    }
+
+
+def alert_data(alert):
+    """Serializable representation of an alert"""
+    return {
+        "message": alert.message,
+        "css": alert.css,
+    }
 
 
 class CancellationAlert(GreenAlert):
@@ -103,13 +184,35 @@ class BookingSuccessfulAlert(GreenAlert):
         super(BookingSuccessfulAlert, self).__init__(message)
 
 
+class BatchBookingAlert(GreenAlert):
+
+    def __init__(self, count):
+        message = "Gebucht: {0} Blöcke".format(count)
+        super(BatchBookingAlert, self).__init__(message)
+
+
+def block_time(date):
+    """Format the start of a block as in the alerts"""
+    return date.strftime("%d.%m.%y, %H:%M Uhr")
+
+
 class NotAllowedAlert(RedAlert):
 
-    def __init__(self):
+    def __init__(self, date=None):
         message = "Buchung nicht möglich"
+        if date:
+            message = "{0}: {1}".format(message, block_time(date))
         super(NotAllowedAlert, self).__init__(message)
 
 
+class BookingAbortedAlert(RedAlert):
+
+    def __init__(self, date):
+        message = "Nicht gebucht: {0} (ein anderer Block ist nicht möglich)".format(
+            block_time(date))
+        super(BookingAbortedAlert, self).__init__(message)
+
+
 class CancellationNotAllowedAlert(RedAlert):
 
     def __init__(self):
@@ -119,6 +222,8 @@ class CancellationNotAllowedAlert(RedAlert):
 
 class QuotaExceededAlert(RedAlert):
 
-    def __init__(self):
+    def __init__(self, date=None):
         message = "Buchungskontingent reicht nicht aus"
+        if date:
+            message = "{0}: {1}".format(message, block_time(date))
         super(QuotaExceededAlert, self).__init__(message)
@@ -1,18 +1,25 @@
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate
 from django.contrib.auth import login as auth_login
 from django.contrib.auth import logout as auth_logout
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse, HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
 from django.shortcuts import render, redirect, reverse, render_to_response
 from django.template import RequestContext
+from django.utils.dateparse import parse_date
+from django.utils.http import urlencode
 from django.db import transaction, IntegrityError
+from django.views.decorators.http import condition
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from website.events import slot_events
+from website.export import FORMATS, lines
 from website.viewmodels import *
-from website.models import BookingPeriod, Booking
+from website.models import BookingPeriod, Booking, Calendar, Day, FacilityVersion, FACILITIES, \
+    HourlyStatistic, Statistic, StatisticRollup
 from schnuffelecken.settings import STATUS_PAGE_REFRESH_RATE_IN_SECONDS, URL
 
 
@@ -82,6 +89,38 @@ def handle_booking(request, facility):
     return BookingSuccessfulAlert(date)
 
 
+def handle_batch_booking(request, facility):
+    """Handle a request to book several blocks at once.
+    Returns an alert for the whole request and the alert of every block.
+    """
+    dates = [datetime.fromtimestamp(float(timestamp))
+             for timestamp in request.POST.getlist("book")]
+    partial = request.POST.get("partial") == "1"
+
+    results = Booking.book_many(
+        request.user.username, facility, dates, partial=partial)
+
+    alerts = []
+    for date, reason in sorted(results.items()):
+        if reason is None:
+            alerts.append((date, BookingSuccessfulAlert(date)))
+        elif reason == "quota":
+            alerts.append((date, QuotaExceededAlert(date)))
+        elif reason == "aborted":
+            alerts.append((date, BookingAbortedAlert(date)))
+        else:
+            alerts.append((date, NotAllowedAlert(date)))
+
+    booked = [date for date, reason in results.items() if reason is None]
+
+    if booked:
+        return BatchBookingAlert(len(booked)), alerts
+
+    # the reason of the failure, not one of the blocks aborted because of it
+    failed = [alert for _, alert in alerts if type(alert) is not BookingAbortedAlert]
+    return (failed[0] if failed else NotAllowedAlert()), alerts
+
+
 def handle_cancellation(request, facility):
     """Handle a cancellation request"""
     date = datetime.fromtimestamp(float(request.POST["cancel"]))
@@ -103,16 +142,20 @@ def bookings(request, facility):
     """View for display of bookings as well as booking and cancel actions.
     """
     info = AllOk()
+    alerts = []
 
     if request.POST and "cancel" in request.POST:
         info = handle_cancellation(request, facility)
+    elif request.POST and len(request.POST.getlist("book")) > 1:
+        info, alerts = handle_batch_booking(request, facility)
     elif request.POST and "book" in request.POST:
         info = handle_booking(request, facility)
 
     quota = Booking.get_user_quota(request.user.username)
 
     booking_period = BookingPeriod(datetime.now())
-    weeks = [WeekViewModel(week, facility, request.user)
+    booking_period.load_bookings(facility)
+    weeks = [WeekViewModel(week, facility, request.user, booking_period.version)
              for week in booking_period.weeks]
 
     context = {
@@ -120,8 +163,10 @@ def bookings(request, facility):
         'bookings': weeks,
         'quota': quota,
         'info': info,
+        'alerts': [alert for _, alert in alerts],
         'display_first_week': not request.POST,
         'is_g': facility == "g",
+        'facility': facility,
     }
 
     response = HttpResponse(
@@ -147,15 +192,124 @@ def handler404(request):
     return response
 
 
+def status_marker(request, facility):
+    """
+    Cheap change marker of the status page: the version and last change of
+    the facility's bookings as well as the current hour, as blocks turn
+    unbookable once their hour has started.
+    Stored on the request, as it is needed for both ETag and Last-Modified.
+    """
+    if not hasattr(request, '_status_marker'):
+        version, modified = FacilityVersion.get_marker(facility)
+        hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+        request._status_marker = (version, max(modified or hour, hour), hour)
+
+    return request._status_marker
+
+
+def status_etag(request, facility):
+    version, _, hour = status_marker(request, facility)
+
+    return "{0}-{1}-{2}-{3:%Y%m%d%H}".format(
+        facility, request.user.username, version, hour)
+
+
+def status_last_modified(request, facility):
+    return status_marker(request, facility)[1]
+
+
+@condition(etag_func=status_etag, last_modified_func=status_last_modified)
 def status(request, facility):
-    """View for status website"""
-    week = WeekViewModel(BookingPeriod(datetime.now()).weeks[
-                         0], facility, request.user)
+    """View for status website.
+    Answers with 304 Not Modified if nothing changed since the last
+    request, which is the common case for the periodically refreshed kiosk screens.
+    """
+    booking_period = BookingPeriod(datetime.now())
+    booking_period.load_bookings(facility)
+    week = WeekViewModel(
+        booking_period.weeks[0], facility, request.user, booking_period.version)
 
     context = {
         "week": week,
         "facility": facility.upper(),
+        "events_url": reverse('events', kwargs={'facility': facility}),
+        "version": booking_period.version,
         "refresh_rate": STATUS_PAGE_REFRESH_RATE_IN_SECONDS,
         "url": URL}
 
     return HttpResponse(render(request, 'website/status.html', context))
+
+
+def parse_day(value):
+    """Return the date of a YYYY-MM-DD value (None if it is missing or invalid)"""
+    try:
+        return parse_date(value or "")
+    except ValueError:
+        return None
+
+
+@staff_member_required
+def statistics(request):
+    """View for the utilization of the facilities per weekday and hour
+    over a date range (default: the last year), for staff only.
+    The bookings since the last roll up are accumulated first, unless the
+    hourly roll up (rollup_statistics) has done so for this hour already.
+    """
+    if StatisticRollup.is_behind():
+        Statistic.roll_up()
+    end = parse_day(request.GET.get("bis")) or datetime.now().date()
+    start = parse_day(request.GET.get("von")) or end - timedelta(364)
+    start, end = min(start, end), max(start, end)
+    facility = request.GET.get("facility")
+    facility = facility if facility in FACILITIES else None
+
+    heatmap = HeatmapViewModel(
+        HourlyStatistic.heatmap(start, end, facility), start, end,
+        Calendar.day_names[:5], range(Day.start_hour, Day.end_hour),
+        1 if facility else len(FACILITIES))
+
+    context = {
+        "heatmap": heatmap,
+        "facility": "Gebäude {0}".format(facility.upper()) if facility else "",
+        "facilities": FACILITIES,
+        "selected": facility,
+        "exports": [("hourly", "Stunden"), ("statistics", "Wochen"), ("bookings", "Buchungen")],
+        "filters": urlencode({"von": start.isoformat(), "bis": end.isoformat(),
+                              "facility": facility or ""})}
+
+    return HttpResponse(render(request, 'website/statistics.html', context))
+
+
+@staff_member_required
+def export(request, kind):
+    """View for the download of bookings or statistics as CSV or JSON lines
+    (format), of one facility or all and from von to bis, for staff only.
+    The rows are streamed, so even years of statistics need little memory.
+    """
+    format = request.GET.get("format")
+    format = format if format in FORMATS else "csv"
+    facility = request.GET.get("facility")
+    facility = facility if facility in FACILITIES else None
+
+    response = StreamingHttpResponse(lines(
+        kind, format, facility, parse_day(request.GET.get("von")), parse_day(request.GET.get("bis"))),
+        content_type=FORMATS[format])
+    response['Content-Disposition'] = 'attachment; filename="{0}.{1}"'.format(kind, format)
+
+    return response
+
+
+def events(request, facility):
+    """View for the server-sent events of a facility's bookings.
+    Used by the status page to update blocks in place.
+    """
+    version = request.META.get(
+        "HTTP_LAST_EVENT_ID") or request.GET.get("version")
+
+    response = StreamingHttpResponse(
+        slot_events(facility, request.user, version),
+        content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+
+    return response